@@ -31,19 +31,30 @@ Environment Variables Required:
 - AWS_SECRET_ACCESS_KEY: AWS secret key for Bedrock access  
 - AWS_REGION: AWS region (default: us-east-1)
 - COLLEGE_SCORECARD_API_KEY: Department of Education API key
-- STRANDS_MODEL_ID: Bedrock model ID (default: anthropic.claude-sonnet-4-5-20250929-v1:0)
+- STRANDS_MODEL_ID: Bedrock model or inference-profile ID (default: Strands' default Bedrock model)
+
+Optional:
+- STRANDS_PROFILE: Set to profile a CLI session with pyinstrument (pip install pyinstrument);
+  the report is written to profile.html on exit
 
 Author: Mark Foster
 Last Updated: October 2025
 """
 
 import asyncio
+import functools
+import heapq
 import os
+import sys
+import threading
+from pathlib import Path
 
 # Load environment variables from .env file for local development
-# In production (App Runner), these come from AWS Secrets Manager
-from dotenv import load_dotenv
-load_dotenv()
+# In production (App Runner), these come from AWS Secrets Manager, so skip the
+# .env lookup (and its filesystem probing) entirely when running on AWS
+if os.getenv("AWS_EXECUTION_ENV") is None and os.getenv("APP_RUNNER_SERVICE_ARN") is None:
+    from dotenv import load_dotenv
+    load_dotenv()
 
 # Import all tool modules to register the @tool-decorated functions with Strands
 # This registration happens automatically on import
@@ -54,20 +65,137 @@ from tools import (
     schools_search,    # Search for schools/colleges by location, type, etc.
     school_detail      # Get detailed information about specific schools
 )
+from tools.scorecard_base import close_session  # shared Scorecard HTTP session
 
 # Strands AI framework and AWS SDK
 from strands import Agent
+from strands.agent import AgentResult
+from strands.models import BedrockModel
 import boto3
+from botocore.config import Config as BotocoreConfig
+
+# Upper bound on Bedrock calls in flight across the process (CLI batch mode and web requests)
+BEDROCK_MAX_CONCURRENCY = 32
+
+# Shared botocore settings for the Bedrock runtime client.
+# Keep-alive and a pool larger than BEDROCK_MAX_CONCURRENCY let concurrent turns reuse
+# HTTPS connections instead of queueing behind botocore's default pool of 10.
+BEDROCK_CLIENT_CONFIG = BotocoreConfig(
+    retries={"max_attempts": 3, "mode": "adaptive"},
+    tcp_keepalive=True,
+    max_pool_connections=64,
+    connect_timeout=5,
+    read_timeout=60,
+)
+
+# Gate for outbound agent calls; acquire it around invoke_async/stream_async
+BEDROCK_SEMAPHORE = asyncio.Semaphore(BEDROCK_MAX_CONCURRENCY)
+
+_aws_inited = False
+_aws_lock = threading.Lock()
+
+def _init_aws_env():
+    """
+    Normalize AWS credential environment variables exactly once per process.
+    
+    When explicit keys are present (App Runner secrets or .env file), make sure
+    boto3/Strands see them and drop any profile settings that would override them.
+    Guarded by a lock so concurrent workers cannot interleave the env mutations.
+    """
+    global _aws_inited
+    with _aws_lock:
+        if _aws_inited:
+            return
+        
+        # Load AWS credentials from environment (set by App Runner or .env file)
+        aws_access_key = os.getenv('AWS_ACCESS_KEY_ID')
+        aws_secret_key = os.getenv('AWS_SECRET_ACCESS_KEY')
+        aws_region = os.getenv('AWS_REGION', 'us-east-1')
+        
+        if aws_access_key and aws_secret_key:
+            # Ensure environment variables are set for boto3/Strands
+            os.environ['AWS_ACCESS_KEY_ID'] = aws_access_key
+            os.environ['AWS_SECRET_ACCESS_KEY'] = aws_secret_key
+            os.environ['AWS_REGION'] = aws_region
+            
+            # Clear any AWS profile environment variables that might conflict
+            # This prevents profile-related errors in containerized environments
+            os.environ.pop('AWS_PROFILE', None)
+            os.environ.pop('AWS_DEFAULT_PROFILE', None)
+        
+        _aws_inited = True
+
+_init_aws_env()
+
+# System prompt sent with every Bedrock call. Kept as one constant so the
+# same text (and therefore the same prompt-cache entry) is reused on every turn.
+SYSTEM_PROMPT = (
+    "You are a helpful college search assistant. "
+    "Use the scorecard tools to find schools, programs, and details. "
+    "Prefer the 'tools.schools_search', 'tools.programs_search', and 'tools.school_detail' functions. "
+    "To search several locations at once (e.g. comparing states), use 'tools.schools_search_many'. "
+    "Important: Do not return the full tool usage information and output. Just add a one liner on what tool(s) were used."
+)
+
+# Inputs that end a REPL or batch session
+_EXIT_CMDS = frozenset({"exit", "quit", "bye"})
+
+# Number of prompts answered concurrently when prompts are piped in on stdin
+BATCH_CONCURRENCY = 4
 
+@functools.lru_cache(maxsize=1)
+def _bedrock_model() -> BedrockModel:
+    """
+    Build the Bedrock model (and its boto3 session/client) once per process.
+    
+    Every agent created by this module shares it, so the bedrock-runtime client
+    and its connection pool are reused across agents and turns.
+    """
+    aws_region = os.getenv('AWS_REGION', 'us-east-1')
+    session = boto3.session.Session(region_name=aws_region)
+    
+    # Only override the model when one is configured; otherwise keep Strands'
+    # default (an inference-profile model ID that Bedrock accepts on demand)
+    model_kwargs = {}
+    model_id = os.getenv('STRANDS_MODEL_ID')
+    if model_id:
+        model_kwargs['model_id'] = model_id
+    
+    return BedrockModel(
+        **model_kwargs,
+        boto_session=session,
+        boto_client_config=BEDROCK_CLIENT_CONFIG,
+        # Bedrock prompt caching: place cache points after the system prompt and
+        # the tool specs so later turns read them from cache instead of paying full input cost
+        cache_prompt="default",
+        cache_tools="default",
+    )
+
+def _build_agent() -> Agent:
+    """Create a new agent (with its own conversation history) on the shared model."""
+    # Create Strands agent with college search specialization
+    # The agent uses Claude 4.5 Sonnet via Amazon Bedrock
+    return Agent(
+        model=_bedrock_model(),
+        name="college-helper",
+        description="AI assistant specialized in college and academic program search using official U.S. Department of Education data.",
+        system_prompt=SYSTEM_PROMPT,
+        callback_handler=None  # No custom callbacks for this implementation
+    )
+
+@functools.lru_cache(maxsize=1)
 def make_agent():
     """
     Create and configure a Strands AI agent for college search assistance.
     
     This function:
-    1. Loads AWS credentials from environment variables
-    2. Clears any conflicting AWS profile settings
-    3. Creates a Strands Agent with Bedrock (Claude 4.5 Sonnet)
-    4. Registers all custom college search tools
+    1. Creates a Strands Agent with Bedrock (Claude 4.5 Sonnet)
+    2. Registers all custom college search tools
+    
+    AWS credentials are normalized once at import by _init_aws_env().
+    
+    The agent is built once and cached, so repeated calls return the same
+    instance (and the same Bedrock client) instead of re-initializing it.
     
     Returns:
         Agent: Configured Strands agent ready for college search queries
@@ -76,41 +204,55 @@ def make_agent():
         AWS_ACCESS_KEY_ID: Required for Bedrock access
         AWS_SECRET_ACCESS_KEY: Required for Bedrock access
         AWS_REGION: AWS region (default: us-east-1)
-        STRANDS_MODEL_ID: Bedrock model identifier
+        STRANDS_MODEL_ID: Bedrock model identifier (optional; Strands' default if unset)
     """
-    # Load AWS credentials from environment (set by App Runner or .env file)
-    aws_access_key = os.getenv('AWS_ACCESS_KEY_ID')
-    aws_secret_key = os.getenv('AWS_SECRET_ACCESS_KEY')
-    aws_region = os.getenv('AWS_REGION', 'us-east-1')
-    
-    if aws_access_key and aws_secret_key:
-        # Ensure environment variables are set for boto3/Strands
-        os.environ['AWS_ACCESS_KEY_ID'] = aws_access_key
-        os.environ['AWS_SECRET_ACCESS_KEY'] = aws_secret_key
-        os.environ['AWS_REGION'] = aws_region
-        
-        # Clear any AWS profile environment variables that might conflict
-        # This prevents profile-related errors in containerized environments
-        if 'AWS_PROFILE' in os.environ:
-            del os.environ['AWS_PROFILE']
-        if 'AWS_DEFAULT_PROFILE' in os.environ:
-            del os.environ['AWS_DEFAULT_PROFILE']
+    return _build_agent()
+
+def result_text(result: AgentResult) -> str:
+    """
+    Return the final assistant text of an agent invocation.
     
-    # Create Strands agent with college search specialization
-    # The agent uses Claude 3.5 Sonnet via Amazon Bedrock
-    agent = Agent(
-        name="college-helper",
-        description="AI assistant specialized in college and academic program search using official U.S. Department of Education data.",
-        system_prompt=(
-            "You are a helpful college search assistant. "
-            "Use the scorecard tools to find schools, programs, and details. "
-            "Prefer the 'tools.schools_search', 'tools.programs_search', and 'tools.school_detail' functions."
-            "Important: Do not return the full tool usage information and output. Just add a one liner on what tool(s) were used."
-        ),
-        callback_handler=None  # No custom callbacks for this implementation
-    )
+    AgentResult has no `output` attribute; its __str__ renders the text
+    content of the final message, so that is used directly.
+    """
+    return str(result)
 
-    return agent
+async def _read_line(prompt: str = "") -> str:
+    """
+    Read one line from stdin in a daemon thread and await it without blocking
+    the event loop.
+    
+    Unlike asyncio.to_thread(input), an abandoned read (e.g. Ctrl-C at the
+    prompt) doesn't hold up loop shutdown or interpreter exit waiting for Enter:
+    daemon threads are not joined, and reading the file descriptor directly
+    (os.read) leaves no lock on sys.stdin held at shutdown. Raises EOFError at
+    end of input (Ctrl-D), like input().
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    
+    def resolve(line):
+        if future.done():  # the awaiting coroutine was cancelled
+            return
+        if line:
+            future.set_result(line.rstrip("\r\n"))
+        else:
+            future.set_exception(EOFError())
+    
+    def reader():
+        # A terminal in canonical mode returns one whole line per read
+        data = os.read(sys.stdin.fileno(), 4096)
+        line = data.decode(sys.stdin.encoding or "utf-8", errors="replace")
+        try:
+            loop.call_soon_threadsafe(resolve, line)
+        except RuntimeError:
+            pass  # loop already closed; nobody is waiting for this line
+    
+    if prompt:
+        sys.stdout.write(prompt)
+        sys.stdout.flush()
+    threading.Thread(target=reader, name="stdin-reader", daemon=True).start()
+    return await future
 
 async def repl(agent: Agent):
     """
@@ -128,12 +270,13 @@ async def repl(agent: Agent):
     
     while True:
         try:
-            user_input = input("You: ").strip()
+            # Read in a daemon thread so the event loop keeps running while the user types
+            user_input = (await _read_line("You: ")).strip()
         except (EOFError, KeyboardInterrupt):
             print("\nGoodbye! 👋")
             break
             
-        if user_input.lower() in {"exit", "quit", "bye"}:
+        if user_input.lower() in _EXIT_CMDS:
             print("Goodbye! Good luck with your college search! 🎓")
             break
             
@@ -141,25 +284,136 @@ async def repl(agent: Agent):
             continue
             
         try:
-            # Get response from the agent
-            result = await agent.invoke_async(user_input)
-            response = getattr(result, "output", str(result))
-            print(f"\nAssistant: {response}\n")
+            # Stream the response so text shows up as soon as the first tokens arrive
+            sys.stdout.write("\nAssistant: ")
+            async for event in agent.stream_async(user_input):
+                if "data" in event and event["data"]:
+                    sys.stdout.write(event["data"])
+                    sys.stdout.flush()
+            print("\n")
         except Exception as e:
             print(f"\nSorry, I encountered an error: {e}\n")
 
 
+async def batch_repl(concurrency: int = BATCH_CONCURRENCY):
+    """
+    Answer prompts piped in on stdin (one per line) concurrently.
+    
+    A reader task feeds an asyncio.Queue while `concurrency` workers pull prompts
+    and call the agent in parallel. Each prompt gets a fresh agent on the shared
+    Bedrock model so independent prompts don't share conversation history.
+    Answers are printed in input order using per-prompt sequence numbers.
+    
+    Args:
+        concurrency: Maximum number of prompts in flight at once
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    finished = []  # heap of (seq, prompt, response) waiting to be printed
+    next_seq = 0
+
+    async def read_prompts():
+        seq = 0
+        while True:
+            line = await asyncio.to_thread(sys.stdin.readline)
+            if not line:
+                break
+            prompt = line.strip()
+            if not prompt:
+                continue
+            if prompt.lower() in _EXIT_CMDS:
+                break
+            await queue.put((seq, prompt))
+            seq += 1
+        # One stop marker per worker
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    def flush_in_order():
+        nonlocal next_seq
+        while finished and finished[0][0] == next_seq:
+            _, prompt, response = heapq.heappop(finished)
+            print(f"You: {prompt}\n\nAssistant: {response}\n")
+            next_seq += 1
+
+    async def worker():
+        while (item := await queue.get()) is not None:
+            seq, prompt = item
+            try:
+                async with BEDROCK_SEMAPHORE:
+                    result: AgentResult = await _build_agent().invoke_async(prompt)
+                response = result_text(result)
+            except Exception as e:
+                response = f"Sorry, I encountered an error: {e}"
+            heapq.heappush(finished, (seq, prompt, response))
+            flush_in_order()
+
+    await asyncio.gather(read_prompts(), *(worker() for _ in range(concurrency)))
+
+
+def run_session(coro):
+    """
+    Run a REPL/batch coroutine to completion.
+    
+    Unlike asyncio.run(), this works when called from code that already has a
+    running event loop (e.g. a notebook or an embedding host): the coroutine is
+    scheduled on that loop and the Task is returned. Otherwise a new loop (uvloop
+    if its policy is installed) is created, run, and closed, along with the
+    shared Scorecard HTTP session opened on it.
+    """
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is not None:
+        return running.create_task(coro)
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.run_until_complete(close_session())
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        asyncio.set_event_loop(None)
+        loop.close()
+
+
 if __name__ == "__main__":
     """
     Entry point for local development and testing.
     
     Run this script directly to interact with the agent via command line:
         python agent.py
+    
+    Or pipe in one prompt per line to answer them concurrently:
+        python agent.py < prompts.txt
     """
+    # Use uvloop's faster event loop when available (it is not built for Windows)
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+    
+    # Opt-in profiling of the whole session (pyinstrument is a dev-only dependency)
+    profiler = None
+    if os.getenv("STRANDS_PROFILE"):
+        from pyinstrument import Profiler
+        profiler = Profiler(async_mode="enabled")
+        profiler.start()
+    
     try:
-        agent = make_agent()
-        asyncio.run(repl(agent))
+        if sys.stdin.isatty():
+            agent = make_agent()
+            run_session(repl(agent))
+        else:
+            run_session(batch_repl())
     except KeyboardInterrupt:
         print("\nExiting...")
     except Exception as e:
         print(f"Failed to start agent: {e}")
+    finally:
+        if profiler is not None:
+            profiler.stop()
+            Path("profile.html").write_text(profiler.output_html(), encoding="utf-8")
+            print("📊 Profile written to profile.html")
@@ -0,0 +1,51 @@
+"""
+Regression tests for requested-but-unused Scorecard fields.
+
+Every field a tool requests costs bytes per row on every call, so each one
+must be read by the code that consumes the rows: the programs_search card
+builder, the schools_search card builder, and the school_detail formatters.
+"""
+
+import importlib
+
+import pytest
+
+pytest.importorskip("pydantic")
+pytest.importorskip("strands")
+
+programs_search = importlib.import_module("tools.programs_search")
+schools_search = importlib.import_module("tools.schools_search")
+school_detail = importlib.import_module("tools.school_detail")
+
+
+def test_fos_fields_are_all_read_into_cards():
+    """FOS_FIELDS must match what _new_card/_extract read (plus the grouping id)."""
+    requested = set(programs_search.FOS_FIELDS.split(","))
+    read = {"id", *programs_search._INST_KEYS, *programs_search._PROG_KEYS}
+    
+    assert requested - read == set(), "FOS_FIELDS requests fields no card reads"
+    assert read - requested == set(), "cards read fields FOS_FIELDS doesn't request"
+
+
+@pytest.mark.parametrize("profile", sorted(schools_search.FIELDSETS))
+def test_schools_search_fieldsets_reach_the_cards(profile):
+    """Each fieldset field lands in the card, under its short label or its API name."""
+    fields = schools_search.FIELDSETS[profile].split(",")
+    row = {field: f"value-{i}" for i, field in enumerate(fields)}
+    if "id" in row:
+        row["id"] = 123456  # the card model types id as an int
+    args = schools_search.SchoolsSearchArgs(state="NY", profiles=[profile])
+    
+    card = schools_search._format_results(args, {"results": [row]})["cards"][0]
+    
+    labels = dict(zip(schools_search._CARD_KEYS, schools_search._CARD_LABELS))
+    missing = [f for f in fields if card.get(labels.get(f, f)) != row[f]]
+    assert not missing, f"{profile!r} fields missing from the card: {missing}"
+
+
+@pytest.mark.parametrize("profile", sorted(school_detail.PROFILE_FORMATTERS))
+def test_school_detail_formatters_only_read_requested_fields(profile):
+    """A markdown line reading an unrequested field would silently never render."""
+    read = {key for keys, _ in school_detail.PROFILE_FORMATTERS[profile] for key in keys}
+    missing = read - set(school_detail._PROFILE_FIELDS[profile])
+    assert not missing, f"{profile!r} formatter reads unrequested fields: {sorted(missing)}"
@@ -40,7 +40,6 @@ Last Updated: October 2025
 """
 
 import random
-from typing import Dict, Any
 from pydantic import BaseModel
 from strands import tool
 
@@ -70,6 +69,14 @@ COLLEGE_JOKES = [
     "What did the college student say when they finally graduated? 'I'm degree-lighted!'"
 ]
 
+# Jokes are formatted once at import so each call is a single lookup
+_FORMATTED_JOKES = tuple(
+    f"Here's a college joke for you:\n\n😄 {joke}" for joke in COLLEGE_JOKES
+)
+
+# Dedicated generator instance (avoids going through the shared module-level one)
+_RNG = random.Random()
+
 
 # ---------------------------------------------------------------------------
 # Input model (no parameters needed, but keeping consistent structure)
@@ -86,7 +93,7 @@ class CollegeJokesArgs(BaseModel):
     name="college_jokes.random",
     description="Get a random college-themed joke to lighten the mood during your college search!",
 )
-async def get_college_joke(args: CollegeJokesArgs = None) -> Dict[str, Any]:
+async def get_college_joke(args: CollegeJokesArgs = None) -> str:
     """
     Returns a randomly selected college-themed joke.
     
@@ -94,8 +101,5 @@ async def get_college_joke(args: CollegeJokesArgs = None) -> Dict[str, Any]:
     perfect for adding some fun to college search conversations.
     """
     
-    # Randomly select one joke from our collection
-    joke = random.choice(COLLEGE_JOKES)
-    
-    # Format the response
-    return f"Here's a college joke for you:\n\n😄 {joke}"
\ No newline at end of file
+    # Randomly select one pre-formatted joke from our collection
+    return _RNG.choice(_FORMATTED_JOKES)
\ No newline at end of file
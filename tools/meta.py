@@ -51,33 +51,77 @@ Author: Mark Foster
 Last Updated: October 2025
 """
 
-import json
-from typing import Dict, Any, List
+import re
+import sys
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List, Set
 from pydantic import BaseModel, Field
 from strands import tool
 
 # We'll re-import the PROFILES dictionary and AWARD_LEVELS_MAP from the other tool files.
 # Since we're all in the same tools package, we use relative imports
 from .school_detail import PROFILES              # field profiles
-from .programs_search import AWARD_LEVELS_MAP, CONTROL_MAP  # mappings for awards and institution types
+from .programs_search import AWARD_LEVELS_MAP, CIP_TITLES, CONTROL_MAP  # mappings for awards, institution types, CIP titles
 
 
 # ---------------------------------------------------------------------------
 # 1. Optional: simple CIP code list for autocomplete
 # ---------------------------------------------------------------------------
-# You can expand this with a proper taxonomy, or load from a JSON file.
-# For demonstration, we include a few common examples.
+# Built from the local CIP title table that programs_search loads from
+# tools/data/cip_titles.csv; extend that file to widen autocomplete coverage.
+CIP_EXAMPLES = [{"cip": cip, "title": title} for cip, title in CIP_TITLES.items()]
 
-CIP_EXAMPLES = [
-    {"cip": "11.0101", "title": "Computer Science"},
-    {"cip": "14.0101", "title": "Engineering, General"},
-    {"cip": "52.0201", "title": "Business Administration and Management, General"},
-    {"cip": "51.3801", "title": "Registered Nursing/Registered Nurse"},
-    {"cip": "26.0101", "title": "Biology/Biological Sciences, General"},
-    {"cip": "40.0501", "title": "Chemistry, General"},
-    {"cip": "23.0101", "title": "English Language and Literature, General"},
-    {"cip": "24.0102", "title": "General Studies"},
-]
+# Lowercased titles are computed once, alongside a token -> entry-index inverted index.
+# Keyword lookups hit the index first; plain substring scanning is only the fallback.
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+_CIP_LC = [(cip, cip["title"].lower()) for cip in CIP_EXAMPLES]
+
+
+def _build_cip_index() -> Dict[str, List[int]]:
+    """Map every lowercased title token to the CIP_EXAMPLES positions containing it."""
+    index: Dict[str, List[int]] = defaultdict(list)
+    for pos, (_, title) in enumerate(_CIP_LC):
+        for token in set(_TOKEN_RE.findall(title)):
+            index[token].append(pos)
+    return dict(index)
+
+
+_CIP_TOKENS = _build_cip_index()
+_CIP_VOCAB = sorted(_CIP_TOKENS)  # sorted so prefix lookups can bisect
+
+
+def _token_candidates(token: str) -> Set[int]:
+    """Entries with a title word starting with token (so 'science' also hits 'sciences')."""
+    found: Set[int] = set()
+    for word in _CIP_VOCAB[bisect_left(_CIP_VOCAB, token):]:
+        if not word.startswith(token):
+            break
+        found.update(_CIP_TOKENS[word])
+    return found
+
+
+def _match_cips(query: str) -> List[Dict[str, str]]:
+    """
+    Find CIP entries whose title contains the (lowercased) query.
+
+    Intersects the posting lists of the query's tokens and only substring-checks
+    that candidate set. Falls back to scanning every title when no token matches.
+    """
+    candidates = None
+    for token in _TOKEN_RE.findall(query):
+        hits = _token_candidates(token)
+        candidates = hits if candidates is None else candidates & hits
+        if not candidates:
+            break
+
+    if candidates:
+        matches = [_CIP_LC[pos][0] for pos in sorted(candidates) if query in _CIP_LC[pos][1]]
+        if matches:
+            return matches
+
+    return [cip for cip, title in _CIP_LC if query in title]
 
 
 # ---------------------------------------------------------------------------
@@ -89,35 +133,18 @@ class CIPAutocompleteArgs(BaseModel):
 
 
 # ---------------------------------------------------------------------------
-# 2. Tool 1: Return field profiles
+# Precomputed tool outputs
 # ---------------------------------------------------------------------------
-@tool(
-    name="scorecard.meta.fields",
-    description="List available field profiles (basic, admissions, costs, outcomes) and the fields they include.",
-)
-async def meta_fields() -> Dict[str, Any]:
-    """
-    Returns the field profiles (used by the other tools) so that
-    your agent or UI can dynamically see what's available.
-
-    Example:
-        await meta_fields({})
-    Output:
-        {
-          "profiles": {
-             "basic": ["id","school.name","school.city",...],
-             "admissions": [...],
-             ...
-          }
-        }
-    """
+# PROFILES, AWARD_LEVELS_MAP and CONTROL_MAP never change at runtime,
+# so the formatted text for the fields/enums tools is built once at import.
+def _build_fields_output() -> str:
+    """Format the field profiles for human display."""
     # Split each comma-separated string into a Python list
     profile_dict = {
         name: fields.split(",")
         for name, fields in PROFILES.items()
     }
 
-    # Format for human display
     formatted_profiles = []
     for name, fields in profile_dict.items():
         formatted_profiles.append(f"**{name}**: {len(fields)} fields")
@@ -127,6 +154,53 @@ async def meta_fields() -> Dict[str, Any]:
     return f"Available field profiles:\n\n" + "\n".join(formatted_profiles)
 
 
+# Frozen (name, code) pairs with interned names, materialized once from the source maps
+_CONTROLS = tuple((sys.intern(name), code) for name, code in CONTROL_MAP.items())
+_AWARDS = tuple((sys.intern(name), tuple(codes)) for name, codes in AWARD_LEVELS_MAP.items())
+
+
+def _build_enums_output() -> str:
+    """Format the control type and award level enumerations for human display."""
+    formatted_text = []
+    formatted_text.append("**Institution Control Types:**")
+    for name, code in _CONTROLS:
+        formatted_text.append(f"• {name}: {code}")
+    
+    formatted_text.append("\n**Award Levels:**")
+    for name, codes in _AWARDS:
+        formatted_text.append(f"• {name}: {list(codes)}")
+
+    return "\n".join(formatted_text)
+
+
+_FIELDS_OUTPUT = _build_fields_output()
+_ENUMS_OUTPUT = _build_enums_output()
+
+
+# ---------------------------------------------------------------------------
+# 2. Tool 1: Return field profiles
+# ---------------------------------------------------------------------------
+@tool(
+    name="scorecard.meta.fields",
+    description="List available field profiles (basic, admissions, costs, outcomes) and the fields they include.",
+)
+async def meta_fields() -> str:
+    """
+    Returns the field profiles (used by the other tools) so that
+    your agent or UI can dynamically see what's available.
+
+    Example:
+        await meta_fields()
+    Output:
+        Available field profiles:
+
+        **basic**: 7 fields
+          Fields: id, school.name, school.city, school.state, school.school_url...
+        ...
+    """
+    return _FIELDS_OUTPUT
+
+
 # ---------------------------------------------------------------------------
 # 3. Tool 2: CIP code autocomplete
 # ---------------------------------------------------------------------------
@@ -137,35 +211,28 @@ async def meta_fields() -> Dict[str, Any]:
         "based on a keyword search in the program title."
     ),
 )
-async def cip_autocomplete(args: CIPAutocompleteArgs) -> Dict[str, Any]:
+async def cip_autocomplete(args: CIPAutocompleteArgs) -> str:
     """
-    Simple keyword-based CIP search.
+    Keyword-based CIP search backed by a token index.
 
     Args:
         args: CIPAutocompleteArgs with query field
 
     Returns:
-        {
-          "matches": [
-            {"cip": "11.0101", "title": "Computer Science"},
-            {"cip": "11.0802", "title": "Data Modeling/Warehousing and Database Administration"},
-            ...
-          ]
-        }
-
-    In production, you can replace CIP_EXAMPLES with a full JSON dataset
-    from the NCES CIP taxonomy (public domain).
+        Found 1 CIP code(s) matching 'computer science':
+
+        • **11.0701**: Computer Science
+
+    CIP_EXAMPLES comes from tools/data/cip_titles.csv; replace it with the full
+    NCES CIP taxonomy (public domain) for complete coverage.
     """
 
     query = args.query.strip().lower()
     if not query:
         return "Please provide a search term to look up CIP codes."
 
-    # Simple substring match
-    matches = [
-        cip for cip in CIP_EXAMPLES
-        if query in cip["title"].lower()
-    ]
+    # Indexed keyword match (substring scan only as a fallback)
+    matches = _match_cips(query)
 
     if not matches:
         return f"No CIP codes found matching '{query}'. Try a broader search term."
@@ -188,28 +255,9 @@ async def cip_autocomplete(args: CIPAutocompleteArgs) -> Dict[str, Any]:
     name="scorecard.meta.enums",
     description="List known enumerations for school control types and award levels.",
 )
-async def meta_enums() -> Dict[str, Any]:
+async def meta_enums() -> str:
     """
     Returns useful enumerations that the agent can reference
     when constructing or validating user requests.
     """
-    # Reverse-map award levels for readability
-    awards_readable: Dict[str, List[int]] = {
-        k: v for k, v in AWARD_LEVELS_MAP.items()
-    }
-
-    controls_readable: Dict[str, int] = {
-        k: v for k, v in CONTROL_MAP.items()
-    }
-
-    # Format for human display
-    formatted_text = []
-    formatted_text.append("**Institution Control Types:**")
-    for name, code in controls_readable.items():
-        formatted_text.append(f"• {name}: {code}")
-    
-    formatted_text.append("\n**Award Levels:**")
-    for name, codes in awards_readable.items():
-        formatted_text.append(f"• {name}: {codes}")
-
-    return "\n".join(formatted_text)
+    return _ENUMS_OUTPUT
@@ -42,33 +42,80 @@ Author: Mark Foster
 Last Updated: October 2025
 """
 
-from typing import Optional, List, Dict, Any, Literal
+import asyncio
+import csv
+import logging
+import math
+import re
+from operator import itemgetter
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Literal, Tuple
 
 from pydantic import BaseModel, Field, conint, field_validator, model_validator
 from strands import tool
 
 # Shared base helpers (API key retrieval + async GET)
-from .scorecard_base import fetch_json, get_key
+from .scorecard_base import fetch_json, get_key, tool_json
 
 
+logger = logging.getLogger(__name__)
+
 # ---------------------------------------------------------------------------
 # 1) Field selection
 # ---------------------------------------------------------------------------
 # The Scorecard API nests program (FOS) values under `latest.programs.cip_6_digit.*`.
-# We keep the field list tight for performance; expand as needed.
+# We keep the field list tight for performance: every field here is read into the
+# returned cards (see _INST_KEYS/_PROG_KEYS). Only add fields the cards actually use.
 FOS_FIELDS = ",".join([
-    "id",
-    "school.name",
-    "school.city",
-    "school.state",
+    "id",                                                   # card id
+    "school.name",                                          # card name
+    "school.city",                                          # card city
+    "school.state",                                         # card state
     # Program (6-digit CIP granularity)
+    "latest.programs.cip_6_digit.code",                     # prog cip
+    "latest.programs.cip_6_digit.title",                    # prog title
+    "latest.programs.cip_6_digit.credential",               # prog credential (award level)
+    "latest.programs.cip_6_digit.earnings.highest_quartile",  # prog earnings_high_q
+    "latest.programs.cip_6_digit.debt.median",              # prog debt_median
+])
+
+# Static part of every query, built once; each call layers its per-call keys on top.
+_BASE_PARAMS: Dict[str, Any] = {"fields": FOS_FIELDS}
+
+
+# Row keys read per result, extracted in one C-level itemgetter call.
+# Rows normally carry every requested field (null when suppressed); _extract falls
+# back to per-key .get() for the rare row that omits one.
+_INST_KEYS = ("school.name", "school.city", "school.state")
+_PROG_KEYS = (
     "latest.programs.cip_6_digit.code",
     "latest.programs.cip_6_digit.title",
-    "latest.programs.cip_6_digit.credential",            # award level
+    "latest.programs.cip_6_digit.credential",
     "latest.programs.cip_6_digit.earnings.highest_quartile",
     "latest.programs.cip_6_digit.debt.median",
-    # Add more fields here if you want (counts, enrollment, etc.)
-])
+)
+_inst_get = itemgetter(*_INST_KEYS)
+_prog_get = itemgetter(*_PROG_KEYS)
+
+
+def _extract(getter: itemgetter, keys: tuple, row: Dict[str, Any]) -> tuple:
+    """Return the values for keys from row, using None for any missing key."""
+    try:
+        return getter(row)
+    except KeyError:
+        return tuple(row.get(k) for k in keys)
+
+
+def _new_card(inst_id: int, row: Dict[str, Any]) -> Dict[str, Any]:
+    """Institution card for the first row seen with this id."""
+    name, city, state = _extract(_inst_get, _INST_KEYS, row)
+    return {
+        "id": inst_id,
+        "name": name,
+        "city": city,
+        "state": state,
+        "programs": [],  # program matches are appended as rows are grouped
+    }
 
 
 # ---------------------------------------------------------------------------
@@ -94,6 +141,60 @@ AWARD_LEVELS_MAP = {
 
 CONTROL_MAP = {"public": 1, "private": 2, "for-profit": 3}
 
+# Display labels indexed by credential code (index 0 unused)
+_CRED_LABELS = (None, "Certificate", "Associate", "Bachelor's", "Post-bacc Cert", "Master's", "Doctoral")
+
+
+def _cred_label(code: int) -> str:
+    """Human label for a credential code, e.g. 3 -> "Bachelor's"."""
+    if isinstance(code, int) and 0 < code < len(_CRED_LABELS):
+        return _CRED_LABELS[code]
+    return f"Level {code}"
+
+# Valid CIP prefixes: 2-digit family, 4-digit series, or full 6-digit code
+# ("11", "11.01", "11.0101")
+_CIP_PREFIX_RE = re.compile(r"^\d{2}(\.\d{2}(\d{2})?)?$")
+
+# Local CIP code -> title table (tools/data/cip_titles.csv, an excerpt of the NCES
+# CIP taxonomy), loaded once at import. Used to answer title lookups without a
+# Scorecard round trip; extend the CSV to cover more codes.
+CIP_TITLES_PATH = Path(__file__).parent / "data" / "cip_titles.csv"
+
+
+def _load_cip_titles(path: Path) -> Dict[str, str]:
+    """Read the cip,title CSV into an insertion-ordered {cip: title} dict."""
+    with path.open(newline="", encoding="utf-8") as f:
+        return {row["cip"]: row["title"] for row in csv.DictReader(f)}
+
+
+CIP_TITLES = _load_cip_titles(CIP_TITLES_PATH)
+
+
+def _cip_title(prefix: str) -> Optional[str]:
+    """Title for a full 6-digit CIP code, or None if it is not in the local table."""
+    return CIP_TITLES.get(prefix)
+
+
+# API filter key for the program CIP code
+CIP_CODE_PARAM = "latest.programs.cip_6_digit.code"
+
+# Max concurrent Scorecard requests when fanning out over several CIP prefixes
+FANOUT_CONCURRENCY = 5
+
+# fetch_all safety limits: pages retrieved per query, and pages in flight at once
+MAX_PAGES = 20
+PAGE_CONCURRENCY = 4
+
+
+def _check_cip(v: str) -> str:
+    """Strip and validate one CIP prefix, raising ValueError if malformed."""
+    v = v.strip()
+    if not _CIP_PREFIX_RE.match(v):
+        raise ValueError(
+            f"Invalid cip_prefix '{v}'. Use a 2-, 4-, or 6-digit CIP code like '11', '11.01', or '11.0101'."
+        )
+    return v
+
 
 # ---------------------------------------------------------------------------
 # 3) Tool argument schema
@@ -104,12 +205,20 @@ class ProgramsSearchArgs(BaseModel):
 
     You must specify **at least one** of:
       • cip_prefix (2/4/6-digit CIP code like '11', '11.01', '11.0101')
+      • cip_prefixes (several CIP codes, searched in parallel and merged)
       • program_text (keyword contained in program title)
     """
     # --- Primary program filters (choose one or both) ---
     cip_prefix: Optional[str] = Field(
         None, description="CIP code prefix at 2-, 4-, or 6-digit granularity (e.g. '11', '11.01', '11.0101')."
     )
+    cip_prefixes: Optional[List[str]] = Field(
+        None,
+        description=(
+            "Several CIP prefixes to search in one call (e.g. ['11', '14'] for CS + engineering). "
+            "Results for all prefixes are merged per institution."
+        ),
+    )
     program_text: Optional[str] = Field(
         None, description="Case-insensitive substring match on program title (best-effort)."
     )
@@ -133,6 +242,23 @@ class ProgramsSearchArgs(BaseModel):
     page: conint(ge=0) = Field(0, description="Page number (0-indexed).")
     per_page: conint(ge=1, le=100) = Field(10, description="Max results per page (institutions).")
 
+    fetch_all: bool = Field(
+        False,
+        description=(
+            f"If True, keep fetching pages after `page` until all results are retrieved "
+            f"(capped at {MAX_PAGES} pages) and return them combined."
+        ),
+    )
+
+    # --- Output ---
+    format: Literal["json", "markdown"] = Field(
+        "json",
+        description=(
+            "'json' (default) returns structured cards + metadata for chaining into other tools; "
+            "'markdown' returns a human-readable summary."
+        ),
+    )
+
     # --- Program nesting behavior ---
     all_programs_nested: bool = Field(
         False,
@@ -143,6 +269,19 @@ class ProgramsSearchArgs(BaseModel):
         ),
     )
 
+    @field_validator("cip_prefix")
+    @classmethod
+    def _check_cip_prefix(cls, v):
+        """
+        Reject malformed CIP codes locally so they never cost an API call.
+        """
+        return _check_cip(v) if v is not None else v
+
+    @field_validator("cip_prefixes")
+    @classmethod
+    def _check_cip_prefixes(cls, v):
+        return [_check_cip(p) for p in v] if v else None
+
     @field_validator("state")
     @classmethod
     def _norm_state(cls, v):
@@ -182,12 +321,87 @@ class ProgramsSearchArgs(BaseModel):
     @classmethod
     def _at_least_one_filter(cls, values):
         """
-        Ensure the user supplied at least one of cip_prefix or program_text.
+        Ensure the user supplied at least one of cip_prefix(es) or program_text.
         """
-        if not (values.get("cip_prefix") or values.get("program_text")):
-            raise ValueError("Provide at least one filter: cip_prefix or program_text.")
+        if not (values.get("cip_prefix") or values.get("cip_prefixes") or values.get("program_text")):
+            raise ValueError("Provide at least one filter: cip_prefix, cip_prefixes, or program_text.")
         return values
 
+    def all_cip_prefixes(self) -> List[str]:
+        """cip_prefix followed by cip_prefixes, deduplicated in order."""
+        merged = ([self.cip_prefix] if self.cip_prefix else []) + (self.cip_prefixes or [])
+        return list(dict.fromkeys(merged))
+
+
+# ---------------------------------------------------------------------------
+# Fetch helpers: auto-pagination and multi-prefix fan-out
+# ---------------------------------------------------------------------------
+async def _fetch_pages(params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Fetch params' page plus every following page (at most MAX_PAGES in total).
+
+    The first response's metadata.total tells us how many pages exist; the rest
+    are requested concurrently, PAGE_CONCURRENCY at a time.
+    """
+    first = await fetch_json(params)
+    total = first.get("metadata", {}).get("total", 0)
+    start = params["page"]
+    end = min(math.ceil(total / params["_per_page"]), start + MAX_PAGES)
+
+    limit = asyncio.Semaphore(PAGE_CONCURRENCY)
+
+    async def fetch_page(page: int) -> Dict[str, Any]:
+        async with limit:
+            return await fetch_json({**params, "page": page})
+
+    rest = await asyncio.gather(*(fetch_page(i) for i in range(start + 1, end)))
+    return [first, *rest]
+
+
+async def _fetch_query(params: Dict[str, Any], fetch_all: bool) -> List[Dict[str, Any]]:
+    """Fetch one query: a single page, or every page when fetch_all is set."""
+    if fetch_all:
+        return await _fetch_pages(params)
+    return [await fetch_json(params)]
+
+
+async def _fetch_for_prefixes(
+    params: Dict[str, Any], prefixes: List[str], fetch_all: bool
+) -> Tuple[List[List[Dict[str, Any]]], List[str]]:
+    """
+    Run one Scorecard query per CIP prefix concurrently (at most FANOUT_CONCURRENCY
+    in flight) and return (the successful queries' pages, the prefixes that failed).
+
+    A failed prefix does not sink the others: it is logged and reported back so
+    the response can say its results are missing. If every prefix fails, one
+    error naming each prefix's failure is raised. Cancellation is never treated
+    as a failed prefix; it propagates.
+    """
+    limit = asyncio.Semaphore(FANOUT_CONCURRENCY)
+
+    async def fetch_one(prefix: str) -> List[Dict[str, Any]]:
+        async with limit:
+            return await _fetch_query({**params, CIP_CODE_PARAM: prefix}, fetch_all)
+
+    responses = await asyncio.gather(*(fetch_one(p) for p in prefixes), return_exceptions=True)
+
+    ok: List[List[Dict[str, Any]]] = []
+    errors: Dict[str, BaseException] = {}
+    for prefix, result in zip(prefixes, responses):
+        if isinstance(result, asyncio.CancelledError):
+            raise result
+        if isinstance(result, BaseException):
+            logger.warning("programs_search: query for CIP prefix %s failed: %s", prefix, result)
+            errors[prefix] = result
+        else:
+            ok.append(result)
+
+    if not ok:
+        summary = "; ".join(f"{prefix}: {err}" for prefix, err in errors.items())
+        first_error = next(iter(errors.values()))
+        raise RuntimeError(f"All {len(prefixes)} CIP prefix queries failed: {summary}") from first_error
+    return ok, list(errors)
+
 
 # ---------------------------------------------------------------------------
 # 4) The Strands tool function
@@ -197,14 +411,18 @@ class ProgramsSearchArgs(BaseModel):
     description=(
         "Search institutions by program (Field-of-Study) using CIP code or program title keywords. "
         "Optionally filter by award level(s), state, and control (public/private/for-profit). "
-        "Returns institutions with an array of matched program rows."
+        "Returns institution cards (with ids usable by the detail tool) and an array of matched program rows."
     ),
 )
-async def programs_search(args: ProgramsSearchArgs) -> Dict[str, Any]:
+async def programs_search(args: ProgramsSearchArgs) -> str:
     """
     Perform a programs (field-of-study) search.
 
-    Returns a dict:
+    A single 6-digit cip_prefix found in the local CIP table, with per_page=1,
+    page=0, no fetch_all and no other filters, is answered locally as
+    {'cip': ..., 'title': ...}.
+
+    Otherwise returns, as compact JSON text (or a markdown string when format="markdown"):
     {
       'cards': [
         {
@@ -225,16 +443,35 @@ async def programs_search(args: ProgramsSearchArgs) -> Dict[str, Any]:
         },
         ...
       ],
-      'metadata': {...},   # pagination info
-      'raw': {...}         # the full API response (optional debugging/enrichment)
+      'metadata': {'total': 42, 'page': 0, 'per_page': 10, 'pages_fetched': 1, 'next_page': 1,
+                   'failed_prefixes': []}
     }
     """
+    # -----------------------------------------------------------------------
+    # STEP 0: Local title lookup (no API call)
+    # -----------------------------------------------------------------------
+    # A single known CIP code with no other filters and per_page=1 on the first
+    # page is a "what is CIP 11.0701?" question; answer it from the local table.
+    # (Paging one institution at a time, or fetch_all, still needs the API.)
+    if (
+        args.cip_prefix
+        and args.per_page == 1
+        and args.page == 0
+        and not args.fetch_all
+        and not any([args.cip_prefixes, args.state, args.control, args.program_text, args.award_levels])
+    ):
+        title = _cip_title(args.cip_prefix)
+        if title is not None:
+            if args.format == "markdown":
+                return f"CIP {args.cip_prefix}: {title}"
+            return tool_json({"cip": args.cip_prefix, "title": title})
+
     # -----------------------------------------------------------------------
     # STEP 1: Base params
     # -----------------------------------------------------------------------
     params: Dict[str, Any] = {
+        **_BASE_PARAMS,
         "api_key": get_key(),
-        "fields": FOS_FIELDS,
         "_per_page": args.per_page,
         "page": args.page,
     }
@@ -249,11 +486,13 @@ async def programs_search(args: ProgramsSearchArgs) -> Dict[str, Any]:
     # CIP prefix: the API accepts exact CIP values; prefix support can vary.
     # Common pattern is to pass a CIP "prefix" and let their backend match.
     # If strict exact-match is enforced in your testing, you can loop prefixes client-side.
-    if args.cip_prefix:
-        params["latest.programs.cip_6_digit.code"] = args.cip_prefix
+    # Several prefixes (cip_prefix + cip_prefixes) are fanned out in STEP 5 instead.
+    prefixes = args.all_cip_prefixes()
+    if len(prefixes) == 1:
+        params[CIP_CODE_PARAM] = prefixes[0]
 
-    # Program title keyword (best-effort; if not supported by API for your field,
-    # you can fetch and filter client-side by title lower().find(keyword) >= 0)
+    # Program title keyword (best-effort on the API side; STEP 6 also filters
+    # client-side in case the API does not support `__contains` for this field)
     if args.program_text:
         params["latest.programs.cip_6_digit.title__contains"] = args.program_text
 
@@ -273,9 +512,15 @@ async def programs_search(args: ProgramsSearchArgs) -> Dict[str, Any]:
         params["latest.programs.cip_6_digit.credential__in"] = ",".join(map(str, args.award_levels))
 
     # -----------------------------------------------------------------------
-    # STEP 5: Call the API
+    # STEP 5: Call the API (one request, or one per CIP prefix in parallel)
     # -----------------------------------------------------------------------
-    data = await fetch_json(params)
+    # Each query yields a list of pages (just one unless fetch_all is set)
+    failed_prefixes: List[str] = []
+    if len(prefixes) > 1:
+        queries, failed_prefixes = await _fetch_for_prefixes(params, prefixes, args.fetch_all)
+    else:
+        queries = [await _fetch_query(params, args.fetch_all)]
+    pages_fetched = sum(len(pages) for pages in queries)
 
     # -----------------------------------------------------------------------
     # STEP 6: Normalize into institution "cards" with matched programs
@@ -286,77 +531,125 @@ async def programs_search(args: ProgramsSearchArgs) -> Dict[str, Any]:
     # to (one of) the program rows. Given our restricted fields list, each result row
     # represents an institution + a single program match. We group by institution id.
     by_id: Dict[int, Dict[str, Any]] = {}
+    get_card = by_id.get  # bound once; the loop below is the hot path
+
+    rows = [row for pages in queries for data in pages for row in data.get("results", [])]
+
+    # Client-side title filter, in case the API ignores `__contains` for this field.
+    # The keyword is case-folded once here rather than per row. Skipped when the
+    # caller asked for all nested programs regardless of the filter.
+    needle = args.program_text.casefold() if args.program_text and not args.all_programs_nested else None
 
-    for row in data.get("results", []):
+    for row in rows:
         inst_id = row.get("id")
         if inst_id is None:
             # Skip rows without an id (unlikely, but defensive)
             continue
 
-        # Build or reuse the institution card
-        card = by_id.get(inst_id)
-        if not card:
-            card = {
-                "id": inst_id,
-                "name": row.get("school.name"),
-                "city": row.get("school.city"),
-                "state": row.get("school.state"),
-                "programs": [],  # we'll append program matches below
-            }
-            by_id[inst_id] = card
+        # Only a present title can be checked; suppressed (null) titles were already
+        # filtered by the API and still get their institution card below
+        if (
+            needle
+            and (prog_title := row.get("latest.programs.cip_6_digit.title"))
+            and needle not in prog_title.casefold()
+        ):
+            continue
+
+        # Build or reuse the institution card (one dict lookup on the common reuse path)
+        card = get_card(inst_id)
+        if card is None:
+            card = by_id[inst_id] = _new_card(inst_id, row)
 
         # Extract the (one) program payload present on this row
-        prog = {
-            "cip": row.get("latest.programs.cip_6_digit.code"),
-            "title": row.get("latest.programs.cip_6_digit.title"),
-            "credential": row.get("latest.programs.cip_6_digit.credential"),
-            "earnings_high_q": row.get("latest.programs.cip_6_digit.earnings.highest_quartile"),
-            "debt_median": row.get("latest.programs.cip_6_digit.debt.median"),
-        }
+        cip, title, credential, earnings, debt = _extract(_prog_get, _PROG_KEYS, row)
 
         # Only add if we actually have a CIP code/title (some rows may be sparse/suppressed)
-        if prog["cip"] or prog["title"]:
-            card["programs"].append(prog)
+        if cip or title:
+            card["programs"].append({
+                "cip": cip,
+                "title": title,
+                "credential": credential,
+                "earnings_high_q": earnings,
+                "debt_median": debt,
+            })
 
     # Convert the grouped map into a list for output
     cards = list(by_id.values())
 
     # -----------------------------------------------------------------------
-    # STEP 7: Format response with enhanced ToolResult format
+    # STEP 7: Build the structured response (markdown only when asked for)
     # -----------------------------------------------------------------------
+    # With several prefixes, the total is the sum of each query's total (an upper bound,
+    # since an institution can match more than one prefix)
+    total_results = sum(pages[0].get("metadata", {}).get("total", 0) for pages in queries) or len(cards)
+    current_page = queries[0][0].get("metadata", {}).get("page", args.page)
+
+    # Each query has more results if the pages it fetched stop short of its own
+    # total (as in schools_search); the next page is the earliest such query's
+    next_pages = [
+        current_page + len(pages)
+        for pages in queries
+        if (current_page + len(pages)) * args.per_page < pages[0].get("metadata", {}).get("total", 0)
+    ]
+
+    metadata = {
+        "total": total_results,
+        "page": current_page,
+        "per_page": args.per_page,
+        "pages_fetched": pages_fetched,
+        "next_page": min(next_pages) if next_pages else None,
+        # CIP prefixes whose query failed; their programs are missing from `cards`
+        "failed_prefixes": failed_prefixes,
+    }
+
+    if args.format == "markdown":
+        return _render_markdown(cards, metadata)
+    return tool_json({"cards": cards, "metadata": metadata})
+
+
+# ---------------------------------------------------------------------------
+# 5) Optional markdown rendering
+# ---------------------------------------------------------------------------
+def _render_markdown(cards: List[Dict[str, Any]], metadata: Dict[str, Any]) -> str:
+    """Render program cards as human-readable markdown (format="markdown")."""
+    # Results are partial when some CIP prefix queries failed; say so up front
+    failed = metadata["failed_prefixes"]
+    warning = (
+        f"⚠️ Results are incomplete: the search failed for CIP prefix(es) {', '.join(failed)}."
+        if failed else None
+    )
+
     if not cards:
-        return "No programs found matching your criteria. Try broadening your search parameters."
+        message = "No programs found matching your criteria. Try broadening your search parameters."
+        return f"{warning}\n\n{message}" if warning else message
 
-    # Create formatted text for human reading
     summary_lines = []
-    metadata = data.get("metadata", {})
-    total_results = metadata.get("total", len(cards))
-    current_page = metadata.get("page", args.page)
-    
-    summary_lines.append(f"Found {total_results} institutions with matching programs.")
-    summary_lines.append(f"Showing page {current_page + 1}, {len(cards)} results:")
+    if warning:
+        summary_lines.append(warning)
+        summary_lines.append("")
+    summary_lines.append(f"Found {metadata['total']} institutions with matching programs.")
+    if metadata["pages_fetched"] > 1:
+        summary_lines.append(f"Fetched {metadata['pages_fetched']} page(s), {len(cards)} results:")
+    else:
+        summary_lines.append(f"Showing page {metadata['page'] + 1}, {len(cards)} results:")
     summary_lines.append("")
     
     for card in cards:
         # Format institution header
-        inst_info = f"**{card['name']}** (ID: {card['id']})"
-        if card['city'] and card['state']:
-            inst_info += f" - {card['city']}, {card['state']}"
-        summary_lines.append(inst_info)
+        location = f" - {card['city']}, {card['state']}" if card['city'] and card['state'] else ""
+        summary_lines.append(f"**{card['name']}** (ID: {card['id']}){location}")
         
-        # Format programs for this institution
+        # Format programs for this institution (segments joined once per line)
         for prog in card['programs']:
-            prog_line = f"  • {prog['title']} (CIP: {prog['cip']})"
+            segments = [f"  • {prog['title']} (CIP: {prog['cip']})"]
             if prog['credential']:
-                cred_map = {1: "Certificate", 2: "Associate", 3: "Bachelor's", 4: "Post-bacc Cert", 5: "Master's", 6: "Doctoral"}
-                default_cred = f"Level {prog['credential']}"
-                prog_line += f" - {cred_map.get(prog['credential'], default_cred)}"
+                segments.append(_cred_label(prog['credential']))
             if prog['earnings_high_q']:
-                prog_line += f" - Top 25% Earnings: ${prog['earnings_high_q']:,}"
-            summary_lines.append(prog_line)
+                segments.append(f"Top 25% Earnings: ${prog['earnings_high_q']:,}")
+            summary_lines.append(" - ".join(segments))
         summary_lines.append("")
     
-    if len(cards) < total_results:
-        summary_lines.append(f"💡 Use page={current_page + 1} to see more results.")
+    if metadata["next_page"] is not None:
+        summary_lines.append(f"💡 Use page={metadata['next_page']} to see more results.")
 
     return "\n".join(summary_lines)
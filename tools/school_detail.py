@@ -39,13 +39,15 @@ Author: Mark Foster
 Last Updated: October 2025
 """
 
-from typing import List, Dict, Any
+import asyncio
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Literal, Tuple
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from strands import tool
 
 # Import common base helpers for key retrieval and API requests
-from .scorecard_base import fetch_json, get_key
+from .scorecard_base import fetch_json, get_key, tool_json
 
 
 # ---------------------------------------------------------------------------
@@ -53,6 +55,8 @@ from .scorecard_base import fetch_json, get_key
 # ---------------------------------------------------------------------------
 # These are predefined subsets of fields from the College Scorecard dataset.
 # You can add or remove fields here depending on how much info you want to expose.
+# Every field is returned to the agent in the default JSON output, so only list
+# fields worth answering with (each one costs bytes per school on every call).
 PROFILES = {
     # Basic identity and location
     "basic": (
@@ -81,6 +85,35 @@ PROFILES = {
     ),
 }
 
+# The API pages results (max 100 per page), so larger id lists are split
+# into chunks of this size and fetched concurrently.
+MAX_IDS_PER_REQUEST = 100
+
+# Each profile pre-split into a tuple of field names (done once at import)
+_PROFILE_FIELDS: Dict[str, Tuple[str, ...]] = {
+    name: tuple(f for f in fields.split(",") if f)
+    for name, fields in PROFILES.items()
+}
+
+
+@lru_cache(maxsize=32)
+def _fields_for(profiles: FrozenSet[str]) -> str:
+    """
+    Return the comma-separated `fields` value for a set of profile names.
+
+    Fields are deduplicated and emitted in PROFILES order, so the same set of
+    profiles always produces the same string (and the same request URL).
+    """
+    seen = set()
+    ordered: List[str] = []
+    for name in _PROFILE_FIELDS:
+        if name in profiles:
+            for f in _PROFILE_FIELDS[name]:
+                if f not in seen:
+                    seen.add(f)
+                    ordered.append(f)
+    return ",".join(ordered)
+
 
 # ---------------------------------------------------------------------------
 # 2. Define the Pydantic arguments model
@@ -92,12 +125,41 @@ class SchoolDetailArgs(BaseModel):
     Attributes:
         ids (List[int]): One or more institution IDs (from prior search results).
         profiles (List[str]): One or more field group names (basic, admissions, costs, outcomes).
+        format (str): "json" (default) for structured rows, "markdown" for a readable summary.
     """
     ids: List[int] = Field(..., description="List of College Scorecard institution IDs.")
     profiles: List[str] = Field(
         ["basic"],
         description=f"List of data profiles to include. Options: {list(PROFILES.keys())}"
     )
+    format: Literal["json", "markdown"] = Field(
+        "json",
+        description="'json' (default) returns the raw field values per school; 'markdown' returns a readable summary.",
+    )
+
+    @field_validator("ids")
+    @classmethod
+    def _check_ids(cls, v):
+        """
+        Require at least one positive institution ID before any request is sent.
+        """
+        if not v:
+            raise ValueError("Provide at least one institution ID.")
+        bad = [i for i in v if i <= 0]
+        if bad:
+            raise ValueError(f"Institution IDs must be positive integers, got {bad}.")
+        return v
+
+    @field_validator("profiles")
+    @classmethod
+    def _known_profiles(cls, v):
+        """
+        Reject unknown profile names instead of silently dropping them.
+        """
+        unknown = [p for p in v if p not in PROFILES]
+        if unknown:
+            raise ValueError(f"Unknown profile(s) {unknown}. Options: {list(PROFILES.keys())}")
+        return v
 
 
 # ---------------------------------------------------------------------------
@@ -111,7 +173,7 @@ class SchoolDetailArgs(BaseModel):
         "Profiles control which field groups are included: basic, admissions, costs, outcomes."
     ),
 )
-async def school_detail(args: SchoolDetailArgs) -> Dict[str, Any]:
+async def school_detail(args: SchoolDetailArgs) -> str:
     """
     Fetch details for one or more schools.
 
@@ -120,70 +182,113 @@ async def school_detail(args: SchoolDetailArgs) -> Dict[str, Any]:
           "ids": [194091, 194824],
           "profiles": ["basic", "costs", "outcomes"]
         }
+
+    Returns:
+        {"schools": [ {"id": 194091, "school.name": ..., ...}, ... ]} as compact
+        JSON text, or a markdown summary when format="markdown".
     """
 
     # -----------------------------------------------------------------------
     # STEP 1: Build the list of fields based on requested profiles
     # -----------------------------------------------------------------------
-    # Each profile string (like "basic", "costs") corresponds to a comma-separated list of fields.
-    # We combine and deduplicate them so we can ask for multiple profiles at once.
-    selected_fields = ",".join({
-        f for p in args.profiles
-        for f in PROFILES.get(p, "").split(",")
-        if f  # ignore blanks
-    })
+    # Each profile string (like "basic", "costs") corresponds to a list of fields.
+    # The combined, deduplicated list is cached per distinct set of profiles.
+    profiles = frozenset(args.profiles)
+    selected_fields = _fields_for(profiles)
 
     # -----------------------------------------------------------------------
     # STEP 2: Prepare the query parameters
     # -----------------------------------------------------------------------
-    params = {
+    # Deduplicate and sort the IDs: no duplicate rows, shorter URLs, and the same
+    # set of schools always maps to the same request (and cache entry).
+    ids = sorted(set(args.ids))
+    chunks = [ids[i:i + MAX_IDS_PER_REQUEST] for i in range(0, len(ids), MAX_IDS_PER_REQUEST)]
+
+    base_params = {
         "api_key": get_key(),
-        "id__in": ",".join(map(str, args.ids)),  # comma-separated list of institution IDs
         "fields": selected_fields,
     }
 
     # -----------------------------------------------------------------------
-    # STEP 3: Make the API request
+    # STEP 3: Make the API request(s), one per chunk of IDs, concurrently
     # -----------------------------------------------------------------------
-    data = await fetch_json(params)
+    responses = await asyncio.gather(*(
+        fetch_json({
+            **base_params,
+            "id__in": ",".join(map(str, chunk)),  # comma-separated list of institution IDs
+            "_per_page": len(chunk),              # default page size (20) would truncate
+        })
+        for chunk in chunks
+    ))
 
     # -----------------------------------------------------------------------
     # STEP 4: Return the results in a format optimized for agent consumption
     # -----------------------------------------------------------------------
-    results = data.get("results", [])
-    
+    results = [row for data in responses for row in data.get("results", [])]
+
+    if args.format == "markdown":
+        return _render_markdown(results, args.ids, profiles)
+    return tool_json({"schools": results})
+
+
+# ---------------------------------------------------------------------------
+# 4. Optional markdown rendering
+# ---------------------------------------------------------------------------
+# Declarative (keys, template) tables for the markdown summary, one per profile
+# (parallel to PROFILES), in display order. A line is emitted only when every
+# key in `keys` has a value; the values are passed to the template positionally.
+_Formatter = Tuple[Tuple[str, ...], str]
+
+PROFILE_FORMATTERS: Dict[str, Tuple[_Formatter, ...]] = {
+    "basic": (
+        (("school.name",), "**{0}**"),
+        (("school.city", "school.state"), "Location: {0}, {1}"),
+    ),
+    "admissions": (
+        (("latest.admissions.admission_rate.overall",), "Admission Rate: {0:.1%}"),
+    ),
+    "costs": (
+        (("latest.cost.tuition.in_state",), "In-State Tuition: ${0:,}"),
+        (("latest.cost.tuition.out_of_state",), "Out-of-State Tuition: ${0:,}"),
+    ),
+    "outcomes": (
+        (("latest.earnings.10_yrs_after_entry.median",), "Median Earnings (10 years): ${0:,}"),
+    ),
+}
+
+
+@lru_cache(maxsize=32)
+def _formatters_for(profiles: FrozenSet[str]) -> Tuple[_Formatter, ...]:
+    """
+    Return the formatter entries for a set of profile names, in PROFILES order,
+    so unrequested profiles cost no work at render time.
+    """
+    return tuple(
+        item
+        for name in PROFILE_FORMATTERS
+        if name in profiles
+        for item in PROFILE_FORMATTERS[name]
+    )
+
+
+def _format_school(school: Dict[str, Any], formatters: Tuple[_Formatter, ...]) -> str:
+    """Render one school row using the active formatter entries."""
+    get = school.get
+    return "\n".join(
+        template.format(*values)
+        for keys, template in formatters
+        if all(values := [get(k) for k in keys])
+    )
+
+
+def _render_markdown(
+    results: List[Dict[str, Any]], ids: List[int], profiles: FrozenSet[str]
+) -> str:
+    """Render school rows as human-readable markdown (format="markdown")."""
     if not results:
-        return f"No schools found for IDs: {args.ids}"
-    
-    # Format the results for better readability by the agent
-    formatted_schools = []
-    for school in results:
-        school_info = []
-        
-        # Basic info
-        if school.get("school.name"):
-            school_info.append(f"**{school['school.name']}**")
-        if school.get("school.city") and school.get("school.state"):
-            school_info.append(f"Location: {school['school.city']}, {school['school.state']}")
-        
-        # Admissions info
-        if school.get("latest.admissions.admission_rate.overall"):
-            rate = school["latest.admissions.admission_rate.overall"]
-            school_info.append(f"Admission Rate: {rate:.1%}")
-        
-        # Cost info
-        if school.get("latest.cost.tuition.in_state"):
-            tuition = school["latest.cost.tuition.in_state"]
-            school_info.append(f"In-State Tuition: ${tuition:,}")
-        if school.get("latest.cost.tuition.out_of_state"):
-            tuition = school["latest.cost.tuition.out_of_state"]
-            school_info.append(f"Out-of-State Tuition: ${tuition:,}")
-        
-        # Outcomes
-        if school.get("latest.earnings.10_yrs_after_entry.median"):
-            earnings = school["latest.earnings.10_yrs_after_entry.median"]
-            school_info.append(f"Median Earnings (10 years): ${earnings:,}")
-        
-        formatted_schools.append("\n".join(school_info))
+        return f"No schools found for IDs: {ids}"
     
-    return "\n\n".join(formatted_schools)
+    # Format the results for better readability by the agent, touching only
+    # the fields of the requested profiles
+    formatters = _formatters_for(profiles)
+    return "\n\n".join(_format_school(school, formatters) for school in results)
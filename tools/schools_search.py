@@ -37,16 +37,25 @@ Author: Mark Foster
 Last Updated: October 2025
 """
 
-from pydantic import BaseModel, Field, conint, confloat, model_validator
-from typing import Optional, Literal, List, Dict, Any
+import asyncio
+import logging
+import math
+from itertools import chain, combinations
+from operator import itemgetter
+
+from pydantic import BaseModel, ConfigDict, Field, conint, confloat, model_validator
+from typing import Optional, Literal, List, Dict, Any, FrozenSet, Union
 
 # Import shared helpers from the base module
-from .scorecard_base import fetch_json, get_key
+from .scorecard_base import fetch_json, get_key, prefetch, tool_json
 
 # Import the Strands @tool decorator
 from strands import tool
 
 
+logger = logging.getLogger(__name__)
+
+
 # ---------------------------------------------------------------------------
 # 1. Define groups of fields (profiles) the tool can include in its results
 # ---------------------------------------------------------------------------
@@ -71,10 +80,85 @@ FIELDSETS = {
     ),
 }
 
+# Human-friendly control values -> API numeric codes
+#   1 = Public, 2 = Private nonprofit, 3 = Private for-profit
+CONTROL_CODES = {"public": 1, "private": 2, "for-profit": 3}
+
+# Miles per degree of latitude (and of longitude at the equator)
+MILES_PER_DEGREE = 69.0
+
+
+def _bounding_box(lat: float, lon: float, miles: float) -> Dict[str, str]:
+    """
+    Lat/lon __range filters for a box enclosing the search circle.
+
+    The API still applies the exact `distance` filter; the box just lets it discard
+    far-away rows cheaply first. The longitude range is left out when the box would
+    reach a pole or cross the antimeridian, where a simple range can't describe it.
+    """
+    dlat = miles / MILES_PER_DEGREE
+    box = {
+        "location.lat__range": f"{max(lat - dlat, -90.0):.4f}..{min(lat + dlat, 90.0):.4f}",
+    }
+    if abs(lat) + dlat < 90.0:
+        dlon = miles / (MILES_PER_DEGREE * math.cos(math.radians(lat)))
+        if -180.0 <= lon - dlon and lon + dlon <= 180.0:
+            box["location.lon__range"] = f"{lon - dlon:.4f}..{lon + dlon:.4f}"
+    return box
+
+
+# Fetch page N+1 in the background after serving page N. It costs one extra
+# API call per paged search, so it stays off on DEMO_KEY's small hourly quota.
+PREFETCH_NEXT_PAGE = get_key() != "DEMO_KEY"
+
+# Max searches accepted by schools_search_many in one call
+MAX_BATCH_SEARCHES = 10
+
 # Default to “basic” fields (id, name, city, state, coords, url)
 DEFAULT_FIELDS = FIELDSETS["basic"]
 
 
+def _combine_fieldsets(profiles) -> str:
+    """Deduplicated field list for the given profiles, in FIELDSETS order."""
+    fields = (f for p in FIELDSETS if p in profiles for f in FIELDSETS[p].split(","))
+    return ",".join(dict.fromkeys(fields))
+
+
+def _fields_for(profiles: List[str]) -> str:
+    """`fields` value for the requested profiles (an empty list falls back to basic)."""
+    # Single profile (the default ["basic"] included): its fieldset is already the answer
+    if len(profiles) == 1:
+        return FIELDSETS[profiles[0]]
+    return PROFILE_COMBOS.get(frozenset(profiles), DEFAULT_FIELDS)
+
+
+# Row keys read into each result card, extracted in one C-level itemgetter call.
+# Rows carry every requested field (null when suppressed); _card_values falls back
+# to per-key .get() when the basic profile wasn't requested.
+_CARD_KEYS = ("id", "school.name", "school.city", "school.state", "school.school_url")
+_CARD_LABELS = ("id", "name", "city", "state", "url")
+_CARD_KEY_SET = frozenset(_CARD_KEYS)
+_card_get = itemgetter(*_CARD_KEYS)
+
+
+def _card_values(row: Dict[str, Any]) -> tuple:
+    """Return the _CARD_KEYS values from row, using None for any missing key."""
+    try:
+        return _card_get(row)
+    except KeyError:
+        return tuple(row.get(k) for k in _CARD_KEYS)
+
+
+# Every non-empty combination of profiles (2^4 - 1 = 15) mapped to its `fields`
+# string, computed once at import so requests only do a dict lookup.
+PROFILE_COMBOS: Dict[FrozenSet[str], str] = {
+    frozenset(combo): _combine_fieldsets(combo)
+    for combo in chain.from_iterable(
+        combinations(FIELDSETS, r) for r in range(1, len(FIELDSETS) + 1)
+    )
+}
+
+
 # ---------------------------------------------------------------------------
 # 2. Define the Pydantic argument model for this tool
 # ---------------------------------------------------------------------------
@@ -85,6 +169,11 @@ class SchoolsSearchArgs(BaseModel):
     Each property corresponds to a filter or option for the API query.
     """
 
+    # Arguments are read-only once validated (nothing reassigns them), so freeze
+    # the model to reject accidental assignment. Instances are NOT hashable
+    # (`profiles` is a list), so don't use them as cache keys.
+    model_config = ConfigDict(frozen=True)
+
     # --- LOCATION MODES ---
     state: Optional[str] = Field(None, description="Two-letter state code, e.g. 'NY'.")
     city: Optional[str] = Field(None, description="City name, e.g. 'Rochester'.")
@@ -126,6 +215,15 @@ class SchoolsSearchArgs(BaseModel):
         ),
     )
 
+    # --- OUTPUT ---
+    format: Literal["json", "markdown"] = Field(
+        "json",
+        description=(
+            "'json' (default) returns structured cards + metadata for chaining into other tools; "
+            "'markdown' returns a human-readable summary."
+        ),
+    )
+
     # --- VALIDATION: Must choose exactly ONE location mode ---
     @model_validator(mode='before')
     @classmethod
@@ -133,19 +231,18 @@ class SchoolsSearchArgs(BaseModel):
         """
         Ensures the user provided exactly one location mode.
         """
-        lat, lon, city, state = (
-            values.get("latitude"),
-            values.get("longitude"),
-            values.get("city"),
-            values.get("state"),
-        )
+        get = values.get
+        lat, lon = get("latitude"), get("longitude")
+        city, state = get("city"), get("state")
 
         has_latlon = lat is not None or lon is not None
-        has_citystate = bool(city and state)
-        has_state_only = state is not None and city is None and not has_latlon
-
-        modes = [has_latlon, has_citystate, has_state_only]
-        if sum(modes) != 1:
+        # Count the modes with plain integer math (bools are ints)
+        mode_count = (
+            has_latlon
+            + bool(city and state)
+            + (state is not None and city is None and not has_latlon)
+        )
+        if mode_count != 1:
             raise ValueError(
                 "Specify exactly one location mode: "
                 "(1) state, (2) city+state, or (3) lat+lon."
@@ -156,29 +253,40 @@ class SchoolsSearchArgs(BaseModel):
 
 
 # ---------------------------------------------------------------------------
-# 3. Define the actual Strands tool
+# 3. Response schema (bounds what a tool call can return)
 # ---------------------------------------------------------------------------
-@tool(
-    name="scorecard.schl.search",
-    description=(
-        "Search for institutions using the U.S. College Scorecard API. "
-        "Supports filters by state, city/state, or coordinates, with "
-        "optional filters for control, size, and online-only."
-    ),
-)
-async def schools_search(args: SchoolsSearchArgs) -> Dict[str, Any]:
-    """
-    Executes a search for colleges using the Scorecard API
-    and returns a structured dictionary with summary cards.
+class SchoolCard(BaseModel):
+    """One result: basic fields under short names, other profile fields by API name."""
 
-    Returns:
-        {
-          "cards": [ {id, name, city, state, url}, ... ],
-          "metadata": {...},   # pagination data
-          "raw": {...}         # full API JSON (optional for advanced use)
-        }
-    """
+    # Extra keys are the requested profile fields (e.g. latest.cost.tuition.in_state)
+    model_config = ConfigDict(extra="allow")
+
+    id: Optional[int] = None
+    name: Optional[str] = None
+    city: Optional[str] = None
+    state: Optional[str] = None
+    url: Optional[str] = None
 
+
+class SchoolsSearchMetadata(BaseModel):
+    """Paging info for follow-up calls."""
+    total: int
+    page: int
+    per_page: int
+    next_page: Optional[int] = None
+
+
+class SchoolsSearchResponse(BaseModel):
+    """The complete JSON result of one search: parsed cards plus minimal metadata."""
+    cards: List[SchoolCard]
+    metadata: SchoolsSearchMetadata
+
+
+# ---------------------------------------------------------------------------
+# 4. Query building and result formatting (shared by both tools)
+# ---------------------------------------------------------------------------
+def _build_params(args: SchoolsSearchArgs) -> Dict[str, Any]:
+    """Translate validated arguments into College Scorecard query parameters."""
     # -----------------------------------------------------------------------
     # STEP 1: Build query parameters for the API
     # -----------------------------------------------------------------------
@@ -186,41 +294,41 @@ async def schools_search(args: SchoolsSearchArgs) -> Dict[str, Any]:
         "api_key": get_key(),
         "_per_page": args.per_page,
         "page": args.page,
-        # Join all requested profiles into a single comma-separated field list
-        "fields": ",".join(
-            {f for p in args.profiles for f in FIELDSETS[p].split(",")}
-        ),
+        # Precomputed comma-separated field list for the requested profiles
+        "fields": _fields_for(args.profiles),
     }
 
     # -----------------------------------------------------------------------
-    # STEP 2: Location filters (mutually exclusive)
+    # STEP 2: Location filters (mutually exclusive; one update per mode)
     # -----------------------------------------------------------------------
+    state = args.state.upper() if args.state else None
     if args.latitude is not None and args.longitude is not None:
-        # Geographic search using coordinates and distance
-        params["latitude"] = args.latitude
-        params["longitude"] = args.longitude
-        params["distance"] = f"{args.distance_mi}mi"
-    elif args.city and args.state:
+        # Geographic search using coordinates and distance, plus a bounding-box
+        # prefilter so the server can cull candidates before the radius check
+        params.update({
+            "latitude": args.latitude,
+            "longitude": args.longitude,
+            "distance": f"{args.distance_mi}mi",
+            **_bounding_box(args.latitude, args.longitude, args.distance_mi),
+        })
+    elif args.city and state:
         # City + state exact match
-        params["school.city"] = args.city
-        params["school.state"] = args.state.upper()
+        params.update({"school.city": args.city, "school.state": state})
     else:
         # State-only search
-        params["school.state"] = args.state.upper()
+        params["school.state"] = state
 
     # -----------------------------------------------------------------------
     # STEP 3: Optional filters (control, size, online_only)
     # -----------------------------------------------------------------------
     if args.control:
         # Map human-friendly values to API numeric codes
-        #   1 = Public, 2 = Private nonprofit, 3 = Private for-profit
-        control_map = {"public": 1, "private": 2, "for-profit": 3}
-        params["school.control"] = control_map[args.control]
-
-    if args.min_size or args.max_size:
-        # API supports a “range” syntax like 0..10000
-        lo = args.min_size or 0
-        hi = args.max_size or 999999
+        params["school.control"] = CONTROL_CODES[args.control]
+
+    if args.min_size is not None or args.max_size is not None:
+        # API supports a “range” syntax like 0..10000 (an explicit 0 is kept)
+        lo = args.min_size if args.min_size is not None else 0
+        hi = args.max_size if args.max_size is not None else 999999
         params["latest.student.size__range"] = f"{lo}..{hi}"
 
     if args.online_only is not None:
@@ -235,58 +343,169 @@ async def schools_search(args: SchoolsSearchArgs) -> Dict[str, Any]:
         order = "" if args.sort_order == "asc" else "desc"
         params["sort"] = f"{args.sort_by}:{order}" if order else args.sort_by
 
-    # -----------------------------------------------------------------------
-    # STEP 5: Make the API request
-    # -----------------------------------------------------------------------
-    data = await fetch_json(params)
+    return params
 
-    # -----------------------------------------------------------------------
-    # STEP 6: Transform the raw API results into lightweight “cards”
-    # -----------------------------------------------------------------------
+
+def _format_results(args: SchoolsSearchArgs, data: Dict[str, Any]) -> Union[Dict[str, Any], str]:
+    """Turn one API response into the tool's cards + metadata (or markdown summary)."""
+    # Transform the raw API results into lightweight “cards”: the basic fields under
+    # short names, plus any other requested profile fields under their API names
     results = data.get("results", [])
-    
-    if not results:
-        return "No schools found matching your criteria. Try broadening your search parameters."
-    
-    # Create lightweight cards for display
     cards = []
-    formatted_schools = []
-    
+    seen = set()
     for r in results:
-        # Create simplified card data
-        card = {
-            "id": r.get("id"),
-            "name": r.get("school.name"),
-            "city": r.get("school.city"),
-            "state": r.get("school.state"),
-            "url": r.get("school.school_url"),
-        }
+        # Skip repeated institutions (the API occasionally returns an id twice)
+        values = _card_values(r)
+        school_id = values[0]
+        if school_id is not None:
+            if school_id in seen:
+                continue
+            seen.add(school_id)
+        card = dict(zip(_CARD_LABELS, values))
+        card.update((k, v) for k, v in r.items() if k not in _CARD_KEY_SET)
         cards.append(card)
-        
-        # Format for human reading
-        school_info = []
+
+    if len(cards) < len(results):
+        logger.warning("schools_search: dropped %d duplicate result(s)", len(results) - len(cards))
+
+    # Paging info for follow-up calls
+    api_meta = data.get("metadata", {})
+    total_results = api_meta.get("total", len(results))
+    current_page = api_meta.get("page", args.page)
+    has_more = (current_page + 1) * args.per_page < total_results
+    metadata = {
+        "total": total_results,
+        "page": current_page,
+        "per_page": args.per_page,
+        "next_page": current_page + 1 if has_more else None,
+    }
+
+    if args.format == "markdown":
+        return _render_markdown(cards, metadata)
+    return SchoolsSearchResponse(cards=cards, metadata=metadata).model_dump()
+
+
+def _render_markdown(cards: List[Dict[str, Any]], metadata: Dict[str, Any]) -> str:
+    """Render school cards as human-readable markdown (format="markdown")."""
+    if not cards:
+        return "No schools found matching your criteria. Try broadening your search parameters."
+
+    # Everything goes into one flat list of fragments, joined once at the end
+    out = [
+        f"Found {metadata['total']} schools matching your criteria.\n"
+        f"Showing page {metadata['page'] + 1}, {len(cards)} results:\n\n"
+    ]
+    
+    for card in cards:
         if card["name"]:
-            school_info.append(f"**{card['name']}** (ID: {card['id']})")
+            out.append(f"**{card['name']}** (ID: {card['id']})\n")
         if card["city"] and card["state"]:
-            school_info.append(f"📍 {card['city']}, {card['state']}")
+            out.append(f"📍 {card['city']}, {card['state']}\n")
         if card["url"]:
-            school_info.append(f"🌐 {card['url']}")
-        
-        formatted_schools.append("\n".join(school_info))
-    
-    # Create summary text
-    metadata = data.get("metadata", {})
-    total_results = metadata.get("total", len(results))
-    current_page = metadata.get("page", args.page)
-    
-    summary_lines = [
-        f"Found {total_results} schools matching your criteria.",
-        f"Showing page {current_page + 1}, {len(results)} results:",
-        "",
-        "\n\n".join(formatted_schools)
-    ]
+            out.append(f"🌐 {card['url']}\n")
+        out.append("\n")
     
-    if len(results) < total_results:
-        summary_lines.append(f"\n💡 Use page={current_page + 1} to see more results.")
+    if metadata["next_page"] is not None:
+        out.append(f"💡 Use page={metadata['next_page']} to see more results.")
     
-    return "\n".join(summary_lines)
+    return "".join(out).rstrip("\n")
+
+
+# ---------------------------------------------------------------------------
+# 5. Define the actual Strands tools
+# ---------------------------------------------------------------------------
+@tool(
+    name="scorecard.schl.search",
+    description=(
+        "Search for institutions using the U.S. College Scorecard API. "
+        "Supports filters by state, city/state, or coordinates, with "
+        "optional filters for control, size, and online-only."
+    ),
+)
+async def schools_search(args: SchoolsSearchArgs) -> str:
+    """
+    Executes a search for colleges using the Scorecard API
+    and returns summary cards as compact JSON text.
+
+    Returns (or a markdown summary when format="markdown"):
+        {
+          "cards": [ {id, name, city, state, url, ...other profile fields}, ... ],
+          "metadata": {"total": 42, "page": 0, "per_page": 10, "next_page": 1}
+        }
+        (shape fixed by SchoolsSearchResponse; the raw API JSON is never passed through)
+    """
+
+    # -----------------------------------------------------------------------
+    # STEP 1: Build the query parameters and make the API request
+    # -----------------------------------------------------------------------
+    params = _build_params(args)
+    data = await fetch_json(params)
+
+    # -----------------------------------------------------------------------
+    # STEP 2: Prefetch the next page (one page ahead at most) while we format
+    # -----------------------------------------------------------------------
+    # "Show me more" is the likeliest follow-up; if the agent asks for it, the
+    # response is already in (or on its way into) the cache.
+    total = data.get("metadata", {}).get("total", 0)
+    if PREFETCH_NEXT_PAGE and (args.page + 1) * args.per_page < total:
+        prefetch({**params, "page": args.page + 1})
+
+    # -----------------------------------------------------------------------
+    # STEP 3: Transform the raw API results into lightweight “cards”
+    # -----------------------------------------------------------------------
+    # Markdown is already text; structured results go to the model as compact JSON
+    results = _format_results(args, data)
+    return results if isinstance(results, str) else tool_json(results)
+
+
+class SchoolsSearchManyArgs(BaseModel):
+    """
+    Several independent school searches to run in one call.
+    """
+    searches: List[SchoolsSearchArgs] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_BATCH_SEARCHES,
+        description=(
+            "List of schools_search argument objects, e.g. one per state or city "
+            f"being compared (at most {MAX_BATCH_SEARCHES})."
+        ),
+    )
+
+
+@tool(
+    name="scorecard.schl.search_many",
+    description=(
+        "Run several school searches at once (e.g. to compare NY vs CA). "
+        "Takes a list of scorecard.schl.search arguments; all queries are sent "
+        "concurrently and the results are returned in the same order."
+    ),
+)
+async def schools_search_many(args: SchoolsSearchManyArgs) -> str:
+    """
+    Executes every search in `args.searches` concurrently and returns their
+    results in input order, as compact JSON text. Each entry is shaped like schools_search's JSON
+    output (a search's `format` is ignored here), or an error entry if that
+    search failed:
+
+        {"searches": [ {"cards": [...], "metadata": {...}}, {"error": "..."}, ... ]}
+    """
+    # All requests go out together over the shared connection pool, so N searches
+    # take about as long as the slowest one instead of N round trips back to back.
+    # One failed search doesn't discard the others: it gets an error entry instead.
+    responses = await asyncio.gather(
+        *(fetch_json(_build_params(search)) for search in args.searches),
+        return_exceptions=True,
+    )
+
+    results = []
+    for i, (search, data) in enumerate(zip(args.searches, responses)):
+        if isinstance(data, asyncio.CancelledError):
+            raise data
+        if isinstance(data, BaseException):
+            logger.warning("schools_search_many: search %d failed: %s", i, data)
+            results.append({"error": str(data)})
+        else:
+            # Always structured, so every entry has the same shape
+            results.append(_format_results(search.model_copy(update={"format": "json"}), data))
+    return tool_json({"searches": results})
@@ -9,9 +9,15 @@ College Scorecard API with consistent error handling and configuration.
 Features:
 - Centralized API endpoint configuration
 - Environment-based API key management
-- Async HTTP client using aiohttp for non-blocking requests
-- Synchronous HTTP client using requests for simple operations
-- Standardized error handling and response parsing
+- Async HTTP client using aiohttp for non-blocking requests (gzip-compressed responses)
+- Shared, pooled aiohttp session reused across calls (close with close_session())
+- Synchronous HTTP client using a pooled urllib3 PoolManager for simple operations
+- Standardized error handling and response parsing (orjson for fast decoding)
+- Retry with exponential backoff on 429/5xx and connection errors (honors Retry-After)
+- In-process LRU + TTL cache of parsed responses (keyed on params minus api_key)
+- Conditional GET revalidation of expired cache entries (ETag / Last-Modified; 304 reuses the body)
+- Background prefetch into the cache (e.g. the next page of a search)
+- Single-flight coalescing of identical in-flight requests
 - Support for demo mode with DEMO_KEY fallback
 
 API Information:
@@ -21,7 +27,7 @@ API Information:
 - Demo Key: Limited functionality for testing
 
 Usage:
-    from tools.scorecard_base import fetch_json, get_key
+    from tools.scorecard_base import fetch_json, get_key, tool_json
     
     # Get API key
     api_key = get_key()
@@ -32,72 +38,346 @@ Usage:
 
 Environment Variables:
 - COLLEGE_SCORECARD_API_KEY: Your API key from api.data.gov
+- SCORECARD_CACHE_MAXSIZE: Max cached responses (default 512)
+- SCORECARD_CACHE_TTL: Seconds a cached response stays fresh (default 3600)
 
 Author: Mark Foster
 Last Updated: October 2025
 """
 
+import asyncio
+import functools
+import logging
 import os
-import requests
+import random
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import quote, urlencode
 import aiohttp
-from typing import Dict, Any
+import orjson
+from yarl import URL  # ships with aiohttp
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
 
 # Base URL for the U.S. Department of Education's College Scorecard API.
 # This endpoint returns institution and program data in JSON format.
 API_BASE = "https://api.data.gov/ed/collegescorecard/v1/schools.json"
 
 
+# Always ask for a compressed body: the JSON pages compress several-fold, and the
+# client decompresses transparently before we ever see the bytes. (br is left out
+# so we don't depend on a brotli decoder being installed.)
+REQUEST_HEADERS = {"Accept-Encoding": "gzip, deflate"}
+
+
+# Shared connection pool limits: total open connections, and per host (everything
+# goes to api.data.gov, so the per-host cap is what bounds parallel fan-out).
+# aiohttp speaks HTTP/1.1, one request per connection at a time, so the per-host cap
+# is sized for the widest fan-out the tools issue (programs_search: 5 prefixes x 4
+# pages in flight) so those requests run on warm keep-alive connections, not in a queue.
+POOL_LIMIT = 32
+POOL_LIMIT_PER_HOST = 20
+DNS_CACHE_TTL_SECONDS = 300   # resolve api.data.gov at most every 5 minutes
+KEEPALIVE_SECONDS = 60        # keep idle pooled connections warm between tool calls
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=25)
+
+
+# Response cache settings. Scorecard data is refreshed at most monthly,
+# so an hour-long TTL is safe and lets repeated questions skip the network.
+# Both can be overridden from the environment (set the TTL to 0 to disable caching).
+CACHE_MAXSIZE = int(os.getenv("SCORECARD_CACHE_MAXSIZE", "512"))
+CACHE_TTL_SECONDS = float(os.getenv("SCORECARD_CACHE_TTL", "3600"))
+
+# After an entry's TTL runs out, its body and validators (ETag / Last-Modified) are
+# kept this much longer so the refresh can be a conditional GET; a 304 reuses the body.
+VALIDATOR_TTL_SECONDS = 24 * 3600
+
+
+# Retry policy for transient failures (rate limiting, upstream 5xx, dropped connections)
+RETRY_ATTEMPTS = 4
+RETRY_BASE_DELAY = 0.5   # seconds; doubled on each attempt
+RETRY_MAX_DELAY = 10.0   # cap, including server-provided Retry-After
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class ScorecardAPIError(RuntimeError):
+    """
+    Raised when the College Scorecard API answers with a non-200 status.
+
+    Subclasses RuntimeError so existing `except RuntimeError` handlers keep working.
+    """
+
+    def __init__(self, status: int, text: str, retry_after: Optional[float] = None):
+        super().__init__(f"College Scorecard API error {status}: {text}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After in seconds (the API sends delta-seconds); None if absent or unparseable."""
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        return None
+
+
+# ---------------------------------------------------------------------------
+# 0. Response cache
+# ---------------------------------------------------------------------------
+class _TTLCache:
+    """
+    Small LRU cache whose entries also expire after a fixed time-to-live.
+
+    Cached values are shared between callers and must be treated as read-only.
+    No asyncio.Lock is needed: get/put never await, so each runs atomically on the loop.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)  # mark as most recently used
+        return value
+
+    def put(self, key: Tuple, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)  # evict least recently used
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+_RESPONSE_CACHE = _TTLCache(CACHE_MAXSIZE, CACHE_TTL_SECONDS)
+
+# cache key -> (conditional request headers, parsed body), for revalidating expired responses
+_VALIDATOR_CACHE = _TTLCache(CACHE_MAXSIZE, VALIDATOR_TTL_SECONDS)
+
+
+def _cache_key(params: Dict[str, Any]) -> Tuple:
+    """Canonical, order-independent cache key; the API key is not part of the query identity."""
+    return tuple(sorted((k, v) for k, v in params.items() if k != "api_key"))
+
+
+@functools.lru_cache(maxsize=CACHE_MAXSIZE)
+def _encoded_url(items: Tuple) -> URL:
+    """Full request URL for sorted (key, value) pairs, percent-encoded exactly once."""
+    query = urlencode(items, safe=",:", quote_via=quote)
+    return URL(f"{API_BASE}?{query}", encoded=True)
+
+
+def _query_url(params: Dict[str, Any]) -> URL:
+    """
+    Canonical request URL for params: keys sorted, so the same query always maps to
+    the same string, and built once per distinct query. The URL is marked as already
+    encoded, so aiohttp sends it as-is instead of re-escaping every value per request.
+    """
+    return _encoded_url(tuple(sorted(params.items())))
+
+
 # ---------------------------------------------------------------------------
 # 1. Get the API key from environment variables
 # ---------------------------------------------------------------------------
+# Read once at import (the entry points call load_dotenv() before importing the tools).
+# Return demo key for testing - in production this should raise an error
+_API_KEY = os.getenv("COLLEGE_SCORECARD_API_KEY") or "DEMO_KEY"
+
+if _API_KEY == "DEMO_KEY":
+    logger.warning(
+        "COLLEGE_SCORECARD_API_KEY is not set; using DEMO_KEY, which is heavily "
+        "rate-limited. Get a key at https://api.data.gov/signup/"
+    )
+
+
 def get_key() -> str:
     """
     Returns the College Scorecard API key from the environment.
 
-    For demo purposes, returns "DEMO_KEY" if no key is set.
-    In production, you should get a real API key from https://api.data.gov/signup/
+    For demo purposes, returns "DEMO_KEY" if no key is set (a warning is logged
+    once at import). In production, you should get a real API key from
+    https://api.data.gov/signup/
     """
-    key = os.getenv("COLLEGE_SCORECARD_API_KEY")
-    if not key:
-        # Return demo key for testing - in production this should raise an error
-        return "DEMO_KEY"
-    return key
+    return _API_KEY
 
 
 # ---------------------------------------------------------------------------
-# 2. Fetch JSON data from the College Scorecard API (Async version)
+# 2. Shared HTTP session (connection pool)
 # ---------------------------------------------------------------------------
-async def fetch_json(params: Dict[str, Any]) -> Dict[str, Any]:
+# One aiohttp session is reused across calls so TCP + TLS setup to api.data.gov
+# is paid once, not per request. A ClientSession is bound to the event loop it
+# was created on, so there is one per loop (e.g. the web server's loop, or the
+# fresh loop each synchronous agent("...") call runs on). Each session gets a
+# guard task that closes it when its loop shuts down, so a loop that goes away
+# without calling close_session() doesn't leak its session and connections.
+_SESSIONS: Dict[asyncio.AbstractEventLoop, Tuple[aiohttp.ClientSession, "asyncio.Task"]] = {}
+
+
+async def _close_at_loop_shutdown(
+    loop: asyncio.AbstractEventLoop, session: aiohttp.ClientSession
+) -> None:
     """
-    Makes an asynchronous HTTP GET request to the College Scorecard API.
+    Wait until cancelled, then close `session`.
 
-    Args:
-        params (dict): Query parameters for the API request.
-                       These include your 'api_key', 'fields', filters, etc.
+    asyncio.run() (used by Strands for each synchronous agent call) cancels
+    leftover tasks before closing its loop, which ends this wait while the loop
+    can still run the close; close_session() cancels it directly.
+    """
+    try:
+        await loop.create_future()  # never resolved; only cancellation ends the wait
+    finally:
+        if _SESSIONS.get(loop, (None,))[0] is session:
+            del _SESSIONS[loop]
+        await session.close()
 
-    Returns:
-        dict: Parsed JSON response from the API.
 
-    Raises:
-        RuntimeError: if the API returns a non-200 status code or invalid JSON.
+def _get_session() -> aiohttp.ClientSession:
+    """Return the shared session for the running loop, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    entry = _SESSIONS.get(loop)
+    if entry is not None:
+        if not entry[0].closed:
+            return entry[0]
+        entry[1].cancel()  # closed elsewhere; retire its guard too
+
+    session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(
+            limit=POOL_LIMIT,
+            limit_per_host=POOL_LIMIT_PER_HOST,
+            ttl_dns_cache=DNS_CACHE_TTL_SECONDS,
+            keepalive_timeout=KEEPALIVE_SECONDS,
+        ),
+        headers=REQUEST_HEADERS,
+        timeout=REQUEST_TIMEOUT,
+    )
+    _SESSIONS[loop] = (session, loop.create_task(_close_at_loop_shutdown(loop, session)))
+    return session
+
+
+async def close_session() -> None:
+    """
+    Close the running loop's shared session (call on shutdown, from that loop).
+
+    Background prefetches still running (and the shielded fetches behind them)
+    are cancelled first, so none is left pending when the loop closes. Safe to
+    call when no session was ever opened; the next request opens a new one.
     """
+    loop = asyncio.get_running_loop()
+    pending = [
+        task
+        for task in (*_PREFETCH_TASKS, *_INFLIGHT.values())
+        if task.get_loop() is loop
+    ]
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
 
+    entry = _SESSIONS.pop(loop, None)
+    if entry is not None:
+        # The guard closes the session as it exits
+        guard = entry[1]
+        guard.cancel()
+        await asyncio.gather(guard, return_exceptions=True)
+
+
+# ---------------------------------------------------------------------------
+# 3. Fetch JSON data from the College Scorecard API (Async version)
+# ---------------------------------------------------------------------------
+def _conditional_headers(headers) -> Dict[str, str]:
+    """Request headers that revalidate a response carrying these ETag / Last-Modified headers."""
+    conditional = {}
+    if headers.get("ETag"):
+        conditional["If-None-Match"] = headers["ETag"]
+    if headers.get("Last-Modified"):
+        conditional["If-Modified-Since"] = headers["Last-Modified"]
+    return conditional
+
+
+async def _get_once(
+    params: Dict[str, Any], headers: Optional[Dict[str, str]] = None
+) -> Tuple[int, bytes, Dict[str, str]]:
+    """
+    Single GET against the API.
+
+    Returns (status, body, conditional headers for revalidating it later) for a
+    200 or a 304 Not Modified (empty body); raises ScorecardAPIError on any other status.
+    """
     # aiohttp allows us to make non-blocking (async) HTTP calls.
     # This lets multiple tools run in parallel when the agent is handling many requests.
-    async with aiohttp.ClientSession() as session:
-        # The API expects parameters like api_key, school.city, fields, etc.
-        async with session.get(API_BASE, params=params, timeout=25) as response:
-            # If the API returns an error (like 400, 403, or 500),
-            # we raise an exception with the text for debugging.
-            if response.status != 200:
-                text = await response.text()
-                raise RuntimeError(
-                    f"College Scorecard API error {response.status}: {text}"
-                )
+    session = _get_session()
+
+    # The API expects parameters like api_key, school.city, fields, etc.
+    async with session.get(_query_url(params), headers=headers) as response:
+        body = await response.read()
+
+        # If the API returns an error (like 400, 403, or 500),
+        # we raise an exception with the text for debugging.
+        if response.status not in (200, 304):
+            raise ScorecardAPIError(
+                response.status,
+                body.decode("utf-8", errors="replace"),
+                _parse_retry_after(response.headers.get("Retry-After")),
+            )
+
+        return response.status, body, _conditional_headers(response.headers)
+
+
+async def _get_with_retry(
+    params: Dict[str, Any], headers: Optional[Dict[str, str]] = None
+) -> Tuple[int, bytes, Dict[str, str]]:
+    """
+    _get_once with retries: transient failures (429, 5xx, connection errors,
+    timeouts) are retried up to RETRY_ATTEMPTS times with jittered exponential
+    backoff, waiting at least as long as the server's Retry-After header asks.
+    """
+    for attempt in range(RETRY_ATTEMPTS):
+        try:
+            return await _get_once(params, headers)
+        except ScorecardAPIError as e:
+            if e.status not in RETRY_STATUSES or attempt == RETRY_ATTEMPTS - 1:
+                raise
+            retry_after = e.retry_after
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if attempt == RETRY_ATTEMPTS - 1:
+                raise
+            retry_after = None
+
+        delay = RETRY_BASE_DELAY * 2 ** attempt + random.random() * 0.1
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        await asyncio.sleep(min(delay, RETRY_MAX_DELAY))
+
 
-            # Parse the API’s JSON response body into a Python dictionary.
-            # If the API responds with invalid JSON, aiohttp raises a ContentTypeError.
-            data = await response.json()
+async def _fetch_and_cache(key: Tuple, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Fetch (or revalidate) params from the API, parse, and store in the caches."""
+    # Revalidate an expired response instead of downloading it again
+    stale = _VALIDATOR_CACHE.get(key)
+    headers = stale[0] if stale is not None else None
+
+    status, body, validators = await _get_with_retry(params, headers)
+    if status == 304 and stale is not None:
+        data = stale[1]
+        validators = validators or stale[0]
+    else:
+        # The `fields` param already limits each result row to the keys the tools read,
+        # so a single full parse of the (small) body is all that's needed.
+        data = orjson.loads(body)
+
+    _RESPONSE_CACHE.put(key, data)
+    if validators:
+        _VALIDATOR_CACHE.put(key, (validators, data))
 
     # At this point, data typically looks like:
     # {
@@ -108,9 +388,115 @@ async def fetch_json(params: Dict[str, Any]) -> Dict[str, Any]:
     return data
 
 
+# Single-flight: cache key -> the Task currently fetching it. Concurrent identical
+# queries (which would all miss the cache) await the same Task instead of each
+# hitting the network.
+_INFLIGHT: Dict[Tuple, "asyncio.Task"] = {}
+
+
+def _inflight_done(key: Tuple, task: "asyncio.Task") -> None:
+    if _INFLIGHT.get(key) is task:
+        del _INFLIGHT[key]
+    if not task.cancelled():
+        task.exception()  # mark retrieved; every waiter already got it re-raised
+
+
+async def fetch_json(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Makes an asynchronous HTTP GET request to the College Scorecard API.
+
+    Args:
+        params (dict): Query parameters for the API request.
+                       These include your 'api_key', 'fields', filters, etc.
+
+    Identical queries (ignoring api_key and param order) are answered from an
+    in-process cache for CACHE_TTL_SECONDS. Once an entry expires, the refresh
+    sends its ETag as If-None-Match and its Last-Modified as If-Modified-Since,
+    and a 304 reuses the cached body without decoding anything. Identical
+    queries already in flight share one request.
+
+    Returns:
+        dict: Parsed JSON response from the API (shared with the cache; do not mutate).
+
+    Raises:
+        ScorecardAPIError: (a RuntimeError) if the API returns a non-200 status code.
+        ValueError: if the response body is not valid JSON.
+    """
+    key = _cache_key(params)
+    cached = _RESPONSE_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    # Join an identical in-flight request (Tasks are per loop, so only on the same loop)
+    loop = asyncio.get_running_loop()
+    task = _INFLIGHT.get(key)
+    if task is None or task.get_loop() is not loop:
+        task = loop.create_task(_fetch_and_cache(key, params))
+        _INFLIGHT[key] = task
+        task.add_done_callback(functools.partial(_inflight_done, key))
+
+    # shield: one caller being cancelled must not cancel the fetch for the others
+    return await asyncio.shield(task)
+
+
+# Strong references to in-flight prefetches (the loop only keeps weak ones)
+_PREFETCH_TASKS = set()
+
+
+def _prefetch_done(task: "asyncio.Task") -> None:
+    _PREFETCH_TASKS.discard(task)
+    if not task.cancelled():
+        task.exception()  # speculative: failures are dropped, a real request will retry
+
+
+def prefetch(params: Dict[str, Any]) -> None:
+    """
+    Start fetching params in the background so a later identical fetch_json call
+    is answered from the response cache. Returns immediately; errors are ignored.
+    """
+    if _RESPONSE_CACHE.get(_cache_key(params)) is not None:
+        return
+    task = asyncio.get_running_loop().create_task(fetch_json(params))
+    _PREFETCH_TASKS.add(task)
+    task.add_done_callback(_prefetch_done)
+
+
 # ---------------------------------------------------------------------------
-# 3. Synchronous version for simple tools
+# 4. Synchronous version for simple tools
 # ---------------------------------------------------------------------------
+# Module-level urllib3 pool so repeat sync calls reuse keep-alive connections.
+# urllib3 is only used by this helper (the tools all use the async path), so the
+# pool (and the import) is created on first use instead of at package import.
+SYNC_POOL_MAXSIZE = 8
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+
+def _get_pool():
+    """Return the shared urllib3.PoolManager, creating it on first use."""
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                import urllib3
+
+                _POOL = urllib3.PoolManager(
+                    maxsize=SYNC_POOL_MAXSIZE,
+                    headers=REQUEST_HEADERS,
+                    timeout=urllib3.Timeout(total=25.0),
+                    # Same policy as the async path: retry 429/5xx, honor Retry-After
+                    retries=urllib3.Retry(
+                        total=RETRY_ATTEMPTS - 1,
+                        backoff_factor=RETRY_BASE_DELAY,
+                        status_forcelist=RETRY_STATUSES,
+                        respect_retry_after_header=True,
+                        raise_on_status=False,
+                    ),
+                )
+    return _POOL
+
+
 def fetch_json_sync(params: Dict[str, Any]) -> Dict[str, Any]:
     """
     Makes a synchronous HTTP GET request to the College Scorecard API.
@@ -122,16 +508,32 @@ def fetch_json_sync(params: Dict[str, Any]) -> Dict[str, Any]:
         dict: Parsed JSON response from the API.
 
     Raises:
-        RuntimeError: if the API returns a non-200 status code or invalid JSON.
+        ScorecardAPIError: (a RuntimeError) if the API returns a non-200 status code.
+        ValueError: if the response body is not valid JSON.
     """
-    response = requests.get(API_BASE, params=params, timeout=25)
+    response = _get_pool().request("GET", API_BASE, fields=params)
     
-    if response.status_code != 200:
-        raise RuntimeError(
-            f"College Scorecard API error {response.status_code}: {response.text}"
+    if response.status != 200:
+        raise ScorecardAPIError(
+            response.status,
+            response.data.decode("utf-8", errors="replace"),
+            _parse_retry_after(response.headers.get("Retry-After")),
         )
     
-    return response.json()
+    return orjson.loads(response.data)
+
+
+# ---------------------------------------------------------------------------
+# 5. Tool result serialization
+# ---------------------------------------------------------------------------
+def tool_json(payload: Any) -> str:
+    """
+    Serialize a tool's structured result as compact JSON text for the model.
+
+    Strands turns any non-string tool result into text itself (a Python repr
+    in older releases), so the tools return the exact JSON they want sent.
+    """
+    return orjson.dumps(payload).decode()
 
 
 # Remove the conflicting alias - use the async version directly
@@ -8,7 +8,7 @@ Built with FastAPI and deployed on AWS App Runner, this application provides:
 Features:
 - Real-time streaming chat interface with Server-Sent Events (SSE)
 - Static file serving for frontend assets (HTML/CSS/JS)
-- CORS support for cross-origin requests
+- Opt-in CORS for cross-origin API clients (CORS_ALLOW_ORIGINS)
 - Secure credential management via AWS Secrets Manager
 - Auto-scaling deployment on AWS App Runner
 
@@ -41,59 +41,240 @@ Last Updated: October 2025
 """
 
 import asyncio
-import json
+import atexit
+import hashlib
 import logging
 import os
-from typing import AsyncGenerator
+import queue
+from contextlib import asynccontextmanager
+from logging.handlers import QueueHandler, QueueListener
+from typing import AsyncGenerator, Dict, Optional
 from pathlib import Path
 
 # Load environment variables from .env file for local development
-# In production (AWS App Runner), these come from AWS Secrets Manager
-from dotenv import load_dotenv
-load_dotenv()
+# In production (AWS App Runner), these come from AWS Secrets Manager, so skip the
+# .env lookup (and its filesystem probing) entirely when running on AWS
+if os.getenv("AWS_EXECUTION_ENV") is None and os.getenv("APP_RUNNER_SERVICE_ARN") is None:
+    from dotenv import load_dotenv
+    load_dotenv()
 
 # FastAPI framework and supporting libraries
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import HTMLResponse, StreamingResponse
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
+import orjson
 
 # Import our custom college search agent
-from agent import make_agent
-
-# Configure application logging for debugging and monitoring
-logging.basicConfig(level=logging.INFO)
+from agent import BEDROCK_SEMAPHORE, make_agent, result_text
+from tools.scorecard_base import close_session
+
+# Configure application logging for debugging and monitoring.
+# Handlers on the event loop thread only enqueue records; a QueueListener thread
+# does the formatting and the (blocking) stdout writes, so logging never stalls
+# in-flight SSE streams.
+_LOG_QUEUE: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_log_stream = logging.StreamHandler()
+_log_stream.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+_log_listener = QueueListener(_LOG_QUEUE, _log_stream, respect_handler_level=True)
+logging.basicConfig(level=logging.INFO, format="%(message)s", handlers=[QueueHandler(_LOG_QUEUE)])
+_log_listener.start()
+atexit.register(_log_listener.stop)  # flush queued records on exit
 logger = logging.getLogger(__name__)
 
 # Log environment configuration status (without exposing sensitive data)
 logger.info(f"AWS_REGION: {os.getenv('AWS_REGION', 'not-set')}")
 logger.info(f"COLLEGE_SCORECARD_API_KEY: {'set' if os.getenv('COLLEGE_SCORECARD_API_KEY') else 'using-demo-key'}")
 
+# Build the agent once the event loop is running, and release pooled
+# College Scorecard API connections on shutdown
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create the shared agent on startup; close HTTP sessions on shutdown."""
+    # make_agent() is synchronous (model/client setup), so keep it off the loop
+    app.state.agent = await asyncio.to_thread(make_agent)
+    yield
+    await close_session()
+
+
 # Initialize FastAPI application with metadata
 app = FastAPI(
     title="College Search Assistant",
     description="AI-powered college and academic program search using official U.S. Department of Education data",
     version="2.0.0",
     docs_url="/api/docs",  # Swagger UI documentation
-    redoc_url="/api/redoc"  # ReDoc documentation
+    redoc_url="/api/redoc",  # ReDoc documentation
+    lifespan=lifespan,
 )
 
-# Configure CORS for cross-origin requests (development and production)
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # In production, specify your domain
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# Configure CORS for cross-origin requests.
+# The web interface is served by this app (same origin), so no cross-origin
+# access is allowed by default. To let another origin call the API (e.g. a
+# separate frontend dev server), set CORS_ALLOW_ORIGINS to a comma-separated
+# list such as "http://localhost:5173,https://your-domain".
+CORS_ALLOW_ORIGINS = [
+    origin.strip()
+    for origin in os.getenv("CORS_ALLOW_ORIGINS", "").split(",")
+    if origin.strip()
+]
+
+if CORS_ALLOW_ORIGINS:
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=CORS_ALLOW_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["GET", "POST"],  # All routes are GET pages or POST chat endpoints
+        allow_headers=["Content-Type"],  # The frontend only sends JSON bodies
+    )
+
+# Static HTML pages, read once at startup instead of on every request
+# (they only change with a redeploy, which restarts the process anyway)
+BASE_DIR = Path(__file__).parent
+STATIC_PAGE_NAMES = ("index.html", "privacy-policy.html", "user-agreement.html", "about.html")
+STATIC_PAGES: Dict[str, bytes] = {
+    name: (BASE_DIR / name).read_bytes()
+    for name in STATIC_PAGE_NAMES
+    if (BASE_DIR / name).is_file()
+}
+
+
+# Pages reachable as /<page>.html, with the heading used on their not-found page
+PAGE_TITLES = {
+    "index": "Main Page",
+    "privacy-policy": "Privacy Policy",
+    "user-agreement": "User Agreement",
+    "about": "About Page",
+}
+SERVED_PAGES = frozenset(PAGE_TITLES)
+
+MISSING_INDEX_HTML = """
+        <!DOCTYPE html>
+        <html>
+        <head><title>Error</title></head>
+        <body>
+            <h1>Error</h1>
+            <p>The index.html file was not found. Please ensure it exists in the same directory as web_app.py</p>
+        </body>
+        </html>
+        """
+
+MISSING_PAGE_HTML = """
+        <!DOCTYPE html>
+        <html>
+        <head><title>Error</title></head>
+        <body>
+            <h1>Page Not Found</h1>
+            <a href="/">← Back to EDU Assist</a>
+        </body>
+        </html>
+        """
+
+
+# Strong validators for the cached pages, so browsers can revalidate with
+# If-None-Match and get a body-less 304 when nothing changed
+def _etag(body: bytes) -> str:
+    """Strong ETag for a page body."""
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+STATIC_ETAGS: Dict[str, str] = {name: _etag(body) for name, body in STATIC_PAGES.items()}
+
+
+async def _load_page(name: str) -> Optional[bytes]:
+    """
+    Cached body for a page; a page missing at startup is retried from disk (in a
+    worker thread, so the event loop never blocks on file I/O) and cached if found.
+    """
+    body = STATIC_PAGES.get(name)
+    if body is None:
+        try:
+            body = await asyncio.to_thread((BASE_DIR / name).read_bytes)
+        except FileNotFoundError:
+            return None
+        STATIC_PAGES[name] = body
+        STATIC_ETAGS[name] = _etag(body)
+    return body
+
+
+async def _page_response(request: Request, name: str) -> Optional[Response]:
+    """
+    Response for a page: 304 if the client's If-None-Match still matches,
+    the full page otherwise, or None if the page doesn't exist.
+
+    The repo root is deliberately not mounted with StaticFiles, since that would
+    also expose .env and the source files; only the known pages are served.
+    """
+    body = await _load_page(name)
+    if body is None:
+        return None
+    etag = STATIC_ETAGS[name]
+    # no-cache = "store it, but revalidate first", so a redeploy is picked up at once
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (
+        if_none_match.strip() == "*"
+        or etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    ):
+        return Response(status_code=304, headers=headers)
+    return HTMLResponse(content=body, headers=headers)
+
+
+# Server-Sent Events framing: one `data:` line per JSON payload. orjson encodes
+# straight to UTF-8 bytes, and yielding bytes spares Starlette a str -> bytes
+# encode per frame.
+def _sse(payload: dict) -> bytes:
+    """Format a payload as a single SSE frame."""
+    return b"data: " + orjson.dumps(payload) + b"\n\n"
+
+
+# Frames with fixed payloads, encoded once at import
+SSE_PROCESSING = _sse({"type": "status", "message": "Processing your request..."})
+SSE_COMPLETE = _sse({"type": "complete", "message": "Response complete"})
+SSE_DONE = _sse({"type": "done"})
+
+# SSE comment line (ignored by EventSource) sent first so the response headers
+# go out immediately instead of waiting on the model's first event
+SSE_CONNECTED = b": connected\n\n"
+
+
+# Headers for SSE responses. X-Accel-Buffering stops reverse proxies (nginx, App
+# Runner's front end) from buffering the stream, so tokens reach the browser as sent.
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",
+}
+
+
+# Text chunks are coalesced into one "text" frame until this many characters
+# have built up or this long has passed since the last flush (~one frame of delay)
+SSE_COALESCE_CHARS = 64
+SSE_COALESCE_SECONDS = 0.016
+
+
+# Log every agent lifecycle event from the SSE stream (noisy; for debugging only,
+# and only when the logger is also at DEBUG level)
+TRACE_AGENT_EVENTS = os.getenv("TRACE_AGENT_EVENTS", "").lower() in ("1", "true", "yes")
+
+
+def _trace_event(event: dict) -> None:
+    """Debug-log an agent event loop lifecycle event."""
+    if event.get("init_event_loop", False):
+        logger.debug("🔄 Event loop initialized")
+    elif event.get("start_event_loop", False):
+        logger.debug("▶️ Event loop cycle starting")
+    elif "message" in event:
+        logger.debug("📬 New message created: %s", event["message"]["role"])
+    elif event.get("complete", False):
+        logger.debug("✅ Cycle completed")
+    elif event.get("force_stop", False):
+        logger.debug("🛑 Event loop force-stopped: %s", event.get("force_stop_reason", "unknown reason"))
 
-# Initialize the agent
-agent = make_agent()
 
 # Request models
 class ChatRequest(BaseModel):
-    """Request model for chat messages."""
+    """Request model for chat messages (documents the body; see _read_message)."""
     message: str
 
 class ChatResponse(BaseModel):
@@ -103,275 +284,261 @@ class ChatResponse(BaseModel):
     error: str = None
 
 
-# Health check endpoint
+def _chat_response(payload: ChatResponse) -> Response:
+    """
+    Serialize a ChatResponse with pydantic's native JSON encoder.
+    
+    Returning a Response skips FastAPI's response_model re-validation and
+    jsonable_encoder pass; response_model stays on the route for the API docs.
+    """
+    return Response(content=payload.model_dump_json(), media_type="application/json")
+
+
+# OpenAPI body schema for the chat routes, which read the raw request body
+CHAT_REQUEST_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": ChatRequest.model_json_schema()}},
+    }
+}
+
+
+async def _read_message(request: Request) -> str:
+    """
+    Pull the chat message out of the JSON request body.
+    
+    The body is a single string field, so it's checked directly instead of
+    building a ChatRequest model (and resolving it as a dependency) per request.
+    """
+    try:
+        body = orjson.loads(await request.body())
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=422, detail="Request body must be valid JSON")
+    
+    message = body.get("message") if isinstance(body, dict) else None
+    if not isinstance(message, str):
+        raise HTTPException(status_code=422, detail="'message' is required and must be a string")
+    return message
+
+
+# Health check endpoint (polled by App Runner; the body never changes, so it's
+# encoded once here rather than serialized on every probe)
+HEALTH_BODY = orjson.dumps({"status": "healthy", "service": "college-scorecard-agent"})
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy", "service": "college-scorecard-agent"}
+    return Response(content=HEALTH_BODY, media_type="application/json")
 
 
 # Non-streaming chat endpoint
-@app.post("/chat", response_model=ChatResponse)
-async def chat_endpoint(request: ChatRequest):
+@app.post("/chat", response_model=ChatResponse, openapi_extra=CHAT_REQUEST_OPENAPI)
+async def chat_endpoint(request: Request):
     """
     Simple chat endpoint that returns the complete response.
     """
+    # Malformed bodies get a 422, not the success=False payload below
+    message = await _read_message(request)
+    
     try:
-        logger.info(f"Received chat request: {request.message}")
+        logger.info(f"Received chat request: {message}")
         
-        # Invoke the agent
-        result = await agent.invoke_async(request.message)
-        print(f"Agent result: {result}")
+        # Invoke the agent (bounded so bursts can't exhaust the Bedrock connection pool)
+        async with BEDROCK_SEMAPHORE:
+            agent = request.app.state.agent
+            result = await agent.invoke_async(message)
+        logger.debug("Agent result: %s", result)
         
         # Extract the response text
-        response_text = getattr(result, "output", str(result))
+        response_text = result_text(result)
         
-        return ChatResponse(
+        return _chat_response(ChatResponse(
             response=response_text,
             success=True
-        )
+        ))
         
     except Exception as e:
         logger.error(f"Error processing chat request: {e}")
-        return ChatResponse(
+        return _chat_response(ChatResponse(
             response="",
             success=False,
             error=str(e)
-        )
+        ))
 
 
 # Streaming chat endpoint using Server-Sent Events
-@app.post("/chat/stream", response_model=ChatResponse)
-async def stream_chat(request: ChatRequest):
+@app.post("/chat/stream", response_model=ChatResponse, openapi_extra=CHAT_REQUEST_OPENAPI)
+async def stream_chat(request: Request):
     """
     Streaming chat endpoint using Server-Sent Events (SSE).
     
     This provides real-time updates as the agent processes the request,
     including tool usage and incremental text generation.
     """
+    message = await _read_message(request)
+    agent = request.app.state.agent
 
-    async def event_generator() -> AsyncGenerator[str, None]:
+    async def event_generator() -> AsyncGenerator[bytes, None]:
         """Generate Server-Sent Events for the chat response."""
+        yield SSE_CONNECTED
+        
         try:
-            logger.info(f"Starting streaming chat for: {request.message}")
+            logger.info(f"Starting streaming chat for: {message}")
             
             # Send initial status
-            yield f"data: {json.dumps({'type': 'status', 'message': 'Processing your request...'})}\n\n"
+            yield SSE_PROCESSING
+            
+            # Pending text chunks, flushed as one frame by size or age
+            loop = asyncio.get_running_loop()
+            text_parts: list = []
+            text_size = 0
+            last_flush = loop.time()
             
-            # Stream agent events
-            async for event in agent.stream_async(request.message):
-
-                # Track event loop lifecycle
-                if event.get("init_event_loop", False):
-                    print("🔄 Event loop initialized")
-                elif event.get("start_event_loop", False):
-                    print("▶️ Event loop cycle starting")
-                elif "message" in event:
-                    print(f"📬 New message created: {event['message']['role']}")
-                elif event.get("complete", False):
-                    print("✅ Cycle completed")
-                elif event.get("force_stop", False):
-                    print(f"🛑 Event loop force-stopped: {event.get('force_stop_reason', 'unknown reason')}")
-
-                # Track tool usage
-                if "current_tool_use" in event and event["current_tool_use"].get("name"):
-                    tool_name = event["current_tool_use"]["name"]
-                    print(f"🔧 Using tool: {tool_name}")
-
-                # Show only a snippet of text to keep output clean
-                #if "data" in event:
-                #    print(f"📟 Text: {event["data"]}")
-
-                # Handle text chunks
-                if "data" in event and event["data"]:
-                    yield f"data: {json.dumps({'type': 'text', 'content': event['data']})}\n\n"
-                
-                # Handle tool usage
-                elif "current_tool_use" in event and event["current_tool_use"].get("name"):
-                    tool_name = event["current_tool_use"]["name"]
-                    yield f"data: {json.dumps({'type': '🔧tool', 'name': tool_name, 'status': 'using'})}\n\n"
-                
-                # Handle completion
-                elif "result" in event:
-                    yield f"data: {json.dumps({'type': 'complete', 'message': 'Response complete'})}\n\n"
-                
-                # Handle errors
-                elif event.get("force_stop"):
-                    reason = event.get("force_stop_reason", "Unknown error")
-                    yield f"data: {json.dumps({'type': 'error', 'message': reason})}\n\n"
+            def flush_text() -> bytes:
+                """Encode the pending text as one SSE frame and reset the buffer."""
+                nonlocal text_size, last_flush
+                frame = _sse({'type': 'text', 'content': "".join(text_parts)})
+                text_parts.clear()
+                text_size = 0
+                last_flush = loop.time()
+                return frame
+            
+            # Stream agent events (holding a Bedrock slot for the whole stream)
+            async with BEDROCK_SEMAPHORE:
+                async for event in agent.stream_async(message):
+                    # Track event loop lifecycle (opt-in, debug only)
+                    if TRACE_AGENT_EVENTS and logger.isEnabledFor(logging.DEBUG):
+                        _trace_event(event)
+
+                    # Dispatch on the event's shape; first matching case wins
+                    match event:
+                        # Handle text chunks (buffered; see SSE_COALESCE_*)
+                        case {"data": str() as data} if data:
+                            text_parts.append(data)
+                            text_size += len(data)
+                            if (text_size >= SSE_COALESCE_CHARS
+                                    or loop.time() - last_flush >= SSE_COALESCE_SECONDS):
+                                yield flush_text()
+                    
+                        # Handle tool usage
+                        case {"current_tool_use": {"name": str() as tool_name}} if tool_name:
+                            logger.debug("🔧 Using tool: %s", tool_name)
+                            if text_parts:
+                                yield flush_text()
+                            yield _sse({'type': '🔧tool', 'name': tool_name, 'status': 'using'})
+                    
+                        # Handle completion
+                        case {"result": _}:
+                            if text_parts:
+                                yield flush_text()
+                            yield SSE_COMPLETE
+                    
+                        # Handle errors
+                        case {"force_stop": True}:
+                            if text_parts:
+                                yield flush_text()
+                            reason = event.get("force_stop_reason", "Unknown error")
+                            yield _sse({'type': 'error', 'message': reason})
+            
+            # Don't drop text still buffered if the stream ended without a result
+            if text_parts:
+                yield flush_text()
             
             # Send final completion signal
-            yield f"data: {json.dumps({'type': 'done'})}\n\n"
+            yield SSE_DONE
             
         except Exception as e:
             logger.error(f"Error in streaming chat: {e}")
-            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+            yield _sse({'type': 'error', 'message': str(e)})
     
     return StreamingResponse(
         event_generator(),
         media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-        }
+        headers=SSE_HEADERS,
     )
 
 
 # Serve the main HTML page
 @app.get("/", response_class=HTMLResponse)
-async def serve_index():
+async def serve_index(request: Request):
     """Serve the main chat interface."""
-    try:
-        # Get the directory where this script is located
-        current_dir = Path(__file__).parent
-        html_file_path = current_dir / "index.html"
-        
-        # Read the HTML file
-        with open(html_file_path, 'r', encoding='utf-8') as file:
-            html_content = file.read()
-            
-        return HTMLResponse(content=html_content)
-    
-    except FileNotFoundError:
-        # Fallback error page if index.html is not found
-        error_html = """
-        <!DOCTYPE html>
-        <html>
-        <head><title>Error</title></head>
-        <body>
-            <h1>Error</h1>
-            <p>The index.html file was not found. Please ensure it exists in the same directory as web_app.py</p>
-        </body>
-        </html>
-        """
-        return HTMLResponse(content=error_html, status_code=500)
-
-
-# Serve the privacy policy page
-@app.get("/privacy-policy.html", response_class=HTMLResponse)
-async def serve_privacy_policy():
-    """Serve the privacy policy page."""
-    try:
-        # Get the directory where this script is located
-        current_dir = Path(__file__).parent
-        html_file_path = current_dir / "privacy-policy.html"
-        
-        # Read the HTML file
-        with open(html_file_path, 'r', encoding='utf-8') as file:
-            html_content = file.read()
-            
-        return HTMLResponse(content=html_content)
-    
-    except FileNotFoundError:
-        # Fallback error page if privacy-policy.html is not found
-        error_html = """
-        <!DOCTYPE html>
-        <html>
-        <head><title>Error</title></head>
-        <body>
-            <h1>Privacy Policy Not Found</h1>
-            <p>The privacy-policy.html file was not found.</p>
-            <a href="/">← Back to EDU Assist</a>
-        </body>
-        </html>
-        """
-        return HTMLResponse(content=error_html, status_code=404)
-
-
-# Serve the user agreement page
-@app.get("/user-agreement.html", response_class=HTMLResponse)
-async def serve_user_agreement():
-    """Serve the user agreement page."""
-    try:
-        # Get the directory where this script is located
-        current_dir = Path(__file__).parent
-        html_file_path = current_dir / "user-agreement.html"
-        
-        # Read the HTML file
-        with open(html_file_path, 'r', encoding='utf-8') as file:
-            html_content = file.read()
-            
-        return HTMLResponse(content=html_content)
+    response = await _page_response(request, "index.html")
+    if response is not None:
+        return response
+    # Fallback error page if index.html is not found
+    return HTMLResponse(content=MISSING_INDEX_HTML, status_code=500)
+
+
+# Serve the other HTML pages (privacy policy, user agreement, about) from one route
+@app.get("/{page}.html", response_class=HTMLResponse)
+async def serve_page(page: str, request: Request):
+    """Serve one of the site's static HTML pages."""
+    # Only our own pages are served; anything else gets the generic 404
+    if page not in SERVED_PAGES:
+        return HTMLResponse(content=MISSING_PAGE_HTML, status_code=404)
     
-    except FileNotFoundError:
-        # Fallback error page if user-agreement.html is not found
-        error_html = """
+    response = await _page_response(request, f"{page}.html")
+    if response is not None:
+        return response
+    # Fallback error page if the file is not found
+    error_html = f"""
         <!DOCTYPE html>
         <html>
         <head><title>Error</title></head>
         <body>
-            <h1>User Agreement Not Found</h1>
-            <p>The user-agreement.html file was not found.</p>
+            <h1>{PAGE_TITLES[page]} Not Found</h1>
+            <p>The {page}.html file was not found.</p>
             <a href="/">← Back to EDU Assist</a>
         </body>
         </html>
         """
-        return HTMLResponse(content=error_html, status_code=404)
-
-
-# Serve the about page
-@app.get("/about.html", response_class=HTMLResponse)
-async def serve_about():
-    """Serve the about page."""
-    try:
-        # Get the directory where this script is located
-        current_dir = Path(__file__).parent
-        html_file_path = current_dir / "about.html"
-        
-        # Read the HTML file
-        with open(html_file_path, 'r', encoding='utf-8') as file:
-            html_content = file.read()
-            
-        return HTMLResponse(content=html_content)
-    
-    except FileNotFoundError:
-        # Fallback error page if about.html is not found
-        error_html = """
-        <!DOCTYPE html>
-        <html>
-        <head><title>Error</title></head>
-        <body>
-            <h1>About Page Not Found</h1>
-            <p>The about.html file was not found.</p>
-            <a href="/">← Back to EDU Assist</a>
-        </body>
-        </html>
-        """
-        return HTMLResponse(content=error_html, status_code=404)
+    return HTMLResponse(content=error_html, status_code=404)
+
+
+# API documentation endpoint (static content, encoded once at import)
+DOCS_INFO_BODY = orjson.dumps({
+    "endpoints": {
+        "/": "Main chat interface (HTML)",
+        "/health": "Health check endpoint",
+        "/chat": "Simple chat endpoint (JSON response)",
+        "/chat/stream": "Streaming chat endpoint (Server-Sent Events)",
+        "/docs": "Swagger UI documentation",
+        "/redoc": "ReDoc API documentation"
+    },
+    "usage": {
+        "streaming": "Use /chat/stream for real-time responses",
+        "simple": "Use /chat for complete responses",
+        "frontend": "Visit / for the web interface"
+    }
+})
 
 
-# API documentation endpoint
 @app.get("/docs-info")
 async def api_docs_info():
     """Information about available API endpoints."""
-    return {
-        "endpoints": {
-            "/": "Main chat interface (HTML)",
-            "/health": "Health check endpoint",
-            "/chat": "Simple chat endpoint (JSON response)",
-            "/chat/stream": "Streaming chat endpoint (Server-Sent Events)",
-            "/docs": "Swagger UI documentation",
-            "/redoc": "ReDoc API documentation"
-        },
-        "usage": {
-            "streaming": "Use /chat/stream for real-time responses",
-            "simple": "Use /chat for complete responses",
-            "frontend": "Visit / for the web interface"
-        }
-    }
+    return Response(content=DOCS_INFO_BODY, media_type="application/json")
 
 
 if __name__ == "__main__":
+    import importlib.util
     import uvicorn
     
-    print("🎓 Starting College Scorecard Web Assistant...")
-    print("📖 Visit http://localhost:8000 for the web interface")
-    print("🔗 Visit http://localhost:8000/docs for API documentation")
+    logger.info("🎓 Starting College Scorecard Web Assistant...")
+    logger.info("📖 Visit http://localhost:8000 for the web interface")
+    logger.info("🔗 Visit http://localhost:8000/docs for API documentation")
     
     uvicorn.run(
         "web_app:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
-        log_level="info"
+        # Auto-reload is opt-in (UVICORN_RELOAD=1) since it runs the app under a
+        # file-watcher supervisor; leave it off when benchmarking or deploying
+        reload=os.getenv("UVICORN_RELOAD", "").lower() in ("1", "true", "yes"),
+        log_level="info",
+        # libuv-backed event loop: cheaper awaits/socket writes for SSE streams.
+        # uvloop isn't available on Windows, so fall back to asyncio there.
+        loop="uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        # C HTTP parser (installed with uvicorn[standard]) instead of pure-Python h11
+        http="httptools" if importlib.util.find_spec("httptools") else "h11",
     )
\ No newline at end of file